@@ -1,9 +1,35 @@
 from django.contrib import admin
 
+from blog.exporters import export_response
 from blog.models import Blog
+from blog.search import filter_by_search
+
+
+def _export_action(file_format, compress, description):
+    @admin.action(description=description)
+    def export(modeladmin, request, queryset):
+        return export_response(queryset, file_format, compress)
+
+    export.__name__ = f"export_{file_format}{'_gzip' if compress else ''}"
+    return export
 
 
 @admin.register(Blog)
 class BlogAdmin(admin.ModelAdmin):
     list_display = ("title", "content", "preview", "count_view", "created_at")
-    search_fields = ("title", "created_at")
+    search_fields = ("title",)
+    search_help_text = "Полнотекстовый поиск по заголовку и содержимому"
+    actions = [
+        _export_action("jsonl", False, "Выгрузить в JSONL"),
+        _export_action("jsonl", True, "Выгрузить в JSONL (gzip)"),
+        _export_action("csv", False, "Выгрузить в CSV"),
+        _export_action("csv", True, "Выгрузить в CSV (gzip)"),
+    ]
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Ищет статьи по поисковому индексу вместо icontains по полям.
+        """
+        if not search_term.strip():
+            return queryset, False
+        return filter_by_search(queryset, search_term.strip()), False
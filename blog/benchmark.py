@@ -0,0 +1,450 @@
+"""
+Нагрузочное тестирование ленты, страницы статьи, создания статьи и оплаты.
+
+seed_data наполняет базу статьями и пользователями с разными подписками
+(команда seed_benchmark), run_benchmark выполняет запросы к представлениям
+из нескольких потоков через тестовый клиент Django (команда run_benchmark).
+Запросы к Stripe обслуживает FakeStripeClient с заданной задержкой, поэтому
+замер не зависит от сети и не создает платежей.
+
+Для каждого сценария считаются запросы в секунду, задержки p50/p95/p99 и
+количество запросов к базе. Результат сохраняется в JSON, и два таких файла
+можно сравнить (compare_results), чтобы увидеть регрессию между коммитами.
+"""
+
+import math
+import random
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime, timezone
+
+import stripe
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from blog.models import Blog
+from blog.search import update_search_vectors
+from blog.services import flush_view_counts, invalidate_page_cache
+from users.jobs import run_next_job
+from users.models import Job, Subscription, User
+from users.services import PREMIUM_FOREVER
+from users.stripe_fake import FakeStripeClient
+
+# Телефоны пользователей, созданных seed_data: по ним данные удаляются перед
+# повторным наполнением
+BENCHMARK_PHONE_PREFIX = "+7900"
+
+BENCHMARK_SESSION_PREFIX = "cs_bench_"
+
+SCENARIOS = (
+    "blog_list",
+    "blog_list_premium",
+    "blog_detail",
+    "blog_create",
+    "perform_create",
+    "checkout_jobs",
+)
+
+_SYLLABLES = (
+    "ка",
+    "ро",
+    "ми",
+    "на",
+    "те",
+    "ло",
+    "ви",
+    "ра",
+    "до",
+    "су",
+    "бе",
+    "го",
+    "за",
+    "ли",
+)
+
+
+def _make_vocabulary(rng, size=3000):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(_SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _make_text(rng, vocabulary, weights, words):
+    return " ".join(rng.choices(vocabulary, weights, k=words))
+
+
+def clear_data():
+    """
+    Удаляет статьи, пользователей и подписки, созданные seed_data.
+    """
+    users = User.objects.filter(phone_number__startswith=BENCHMARK_PHONE_PREFIX)
+    Blog.objects.filter(owner__in=users).delete()
+    Subscription.objects.filter(
+        content_id__startswith=BENCHMARK_SESSION_PREFIX
+    ).delete()
+    Subscription.objects.filter(user__in=users).delete()
+    users.delete()
+    invalidate_page_cache("list")
+
+
+def seed_data(
+    posts=100_000,
+    users=10_000,
+    paid_ratio=0.3,
+    pending_ratio=0.2,
+    premium_post_ratio=0.3,
+    batch_size=2000,
+    seed=0,
+):
+    """
+    Наполняет базу данными для нагрузочного тестирования.
+
+    Часть пользователей получает оплаченную подписку (paid_ratio), часть -
+    неоплаченную сессию оплаты (pending_ratio), у остальных подписки нет.
+    Статьи распределяются между пользователями случайно, текст статей
+    собирается из слов с неравномерной частотой, как в настоящих текстах.
+    Объекты создаются через bulk_create, поэтому сигналы не вызываются:
+    поисковые векторы и кэш страниц обновляются явно.
+
+    Args:
+        posts (int): Количество статей.
+        users (int): Количество пользователей.
+        paid_ratio (float): Доля пользователей с оплаченной подпиской.
+        pending_ratio (float): Доля пользователей с неоплаченной сессией.
+        premium_post_ratio (float): Доля платных статей.
+        batch_size (int): Размер пачки bulk_create.
+        seed (int): Начальное значение генератора случайных чисел.
+
+    Returns:
+        dict: Количество созданных статей, пользователей и подписок.
+    """
+    rng = random.Random(seed)
+    clear_data()
+
+    kinds = rng.choices(
+        ("paid", "pending", "none"),
+        weights=(paid_ratio, pending_ratio, max(0.0, 1 - paid_ratio - pending_ratio)),
+        k=users,
+    )
+    subscriptions = Subscription.objects.bulk_create(
+        [
+            Subscription(
+                content_id=f"{BENCHMARK_SESSION_PREFIX}{kind}_{number}",
+                is_subscribed=kind == "paid",
+            )
+            for number, kind in enumerate(kinds)
+            if kind != "none"
+        ],
+        batch_size=batch_size,
+    )
+    subscriptions = iter(subscriptions)
+    created_users = User.objects.bulk_create(
+        [
+            User(
+                phone_number=f"{BENCHMARK_PHONE_PREFIX}{number:07d}",
+                password="!",
+                payments=None if kind == "none" else next(subscriptions),
+                premium_until=PREMIUM_FOREVER if kind == "paid" else None,
+            )
+            for number, kind in enumerate(kinds)
+        ],
+        batch_size=batch_size,
+    )
+    owner_ids = list(
+        User.objects.filter(
+            phone_number__startswith=BENCHMARK_PHONE_PREFIX
+        ).values_list("pk", flat=True)
+    )
+
+    vocabulary = _make_vocabulary(rng)
+    # Частота слова обратно пропорциональна его месту в словаре (закон Ципфа)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    rng.shuffle(vocabulary)
+    for start in range(0, posts, batch_size):
+        Blog.objects.bulk_create(
+            [
+                Blog(
+                    title=_make_text(rng, vocabulary, weights, rng.randint(3, 8))[:100],
+                    content=_make_text(rng, vocabulary, weights, rng.randint(80, 300)),
+                    owner_id=rng.choice(owner_ids),
+                    is_premium=rng.random() < premium_post_ratio,
+                )
+                for _ in range(min(batch_size, posts - start))
+            ]
+        )
+
+    update_search_vectors(Blog.objects.filter(owner_id__in=owner_ids))
+    invalidate_page_cache("list")
+    return {
+        "posts": posts,
+        "users": len(created_users),
+        "paid": kinds.count("paid"),
+        "pending": kinds.count("pending"),
+    }
+
+
+def percentile(values, percent):
+    """
+    Возвращает перцентиль отсортированного списка (метод ближайшего ранга).
+    """
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+
+def summarize(samples, elapsed):
+    """
+    Сводит замеры сценария в показатели.
+
+    Args:
+        samples (list): Замеры запросов (задержка в секундах, количество запросов к базе, успех).
+        elapsed (float): Время выполнения сценария в секундах.
+
+    Returns:
+        dict: Запросы в секунду, задержки в миллисекундах и запросы к базе.
+    """
+    latencies = sorted(latency * 1000 for latency, _, _ in samples)
+    queries = [count for _, count, _ in samples]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, _, ok in samples if not ok),
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "queries": {
+            "mean": round(statistics.fmean(queries), 2) if queries else 0.0,
+            "max": max(queries, default=0),
+        },
+    }
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _measure(action):
+    counter = _QueryCounter()
+    started = time.perf_counter()
+    # Считаются запросы ко всем базам, в том числе к реплике
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(counter))
+        try:
+            ok = action()
+        except Exception:
+            ok = False
+    return time.perf_counter() - started, counter.count, ok
+
+
+class _Scenario:
+    """
+    Сценарий нагрузки: пользователь потока и запрос, который он выполняет.
+    """
+
+    def __init__(self, host, free_blog_ids, premium_user_ids, free_user_ids):
+        self.host = host
+        self.free_blog_ids = free_blog_ids
+        self.premium_user_ids = premium_user_ids
+        self.free_user_ids = free_user_ids
+
+    def client(self, user_id=None):
+        client = Client(HTTP_HOST=self.host)
+        if user_id is not None:
+            client.force_login(User.objects.get(pk=user_id))
+        return client
+
+    def request(self, client, method, path, data=None, expected=(200, 302)):
+        response = getattr(client, method)(path, data)
+        return response.status_code in expected
+
+    def prepare(self, name, rng):
+        """
+        Возвращает действие одного запроса сценария name для текущего потока.
+        """
+        if name == "blog_list":
+            client = self.client()
+            return lambda: self.request(client, "get", reverse("blog:blog_list"))
+        if name == "blog_list_premium":
+            client = self.client(rng.choice(self.premium_user_ids))
+            return lambda: self.request(client, "get", reverse("blog:blog_list"))
+        if name == "blog_detail":
+            client = self.client()
+            return lambda: self.request(
+                client,
+                "get",
+                reverse("blog:blog_detail", args=[rng.choice(self.free_blog_ids)]),
+            )
+        if name == "blog_create":
+            client = self.client(rng.choice(self.premium_user_ids))
+            return lambda: self.request(
+                client,
+                "post",
+                reverse("blog:blog_create"),
+                {"title": f"Нагрузка {rng.random()}", "content": "Текст статьи " * 50},
+            )
+        if name == "perform_create":
+            client = self.client(rng.choice(self.free_user_ids))
+            return lambda: self.request(client, "get", reverse("users:perform_create"))
+        if name == "checkout_jobs":
+            return run_next_job
+        raise ValueError(f"Неизвестный сценарий {name}")
+
+
+def _run_worker(scenario, name, requests, seed):
+    rng = random.Random(seed)
+    try:
+        action = scenario.prepare(name, rng)
+        return [_measure(action) for _ in range(requests)]
+    finally:
+        connections.close_all()
+
+
+def run_scenario(scenario, name, concurrency, requests):
+    """
+    Выполняет requests запросов сценария name в concurrency потоков.
+
+    Returns:
+        dict: Показатели сценария (см. summarize).
+    """
+    per_worker = [
+        requests // concurrency + (worker < requests % concurrency)
+        for worker in range(concurrency)
+    ]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started = time.perf_counter()
+        futures = [
+            executor.submit(_run_worker, scenario, name, count, worker)
+            for worker, count in enumerate(per_worker)
+            if count
+        ]
+        samples = [sample for future in futures for sample in future.result()]
+        elapsed = time.perf_counter() - started
+    return summarize(samples, elapsed)
+
+
+def get_commit():
+    """
+    Возвращает хэш текущего коммита git или None, если он недоступен.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(
+    scenarios=SCENARIOS,
+    concurrency=8,
+    requests=500,
+    stripe_latency=0.05,
+    stripe_paid_ratio=0.0,
+    host="127.0.0.1",
+):
+    """
+    Выполняет сценарии нагрузки по очереди и возвращает результаты.
+
+    На время замера запросы к Stripe обслуживает FakeStripeClient с задержкой
+    stripe_latency секунд. Сценарий checkout_jobs выполняет фоновые задачи,
+    поставленные сценарием perform_create, поэтому идет после него.
+
+    Args:
+        scenarios (tuple): Имена сценариев из SCENARIOS.
+        concurrency (int): Количество параллельных потоков.
+        requests (int): Количество запросов в каждом сценарии.
+        stripe_latency (float): Задержка ответа Stripe в секундах.
+        stripe_paid_ratio (float): Доля сессий оплаты, которые Stripe считает оплаченными.
+        host (str): Заголовок Host запросов, должен входить в ALLOWED_HOSTS.
+
+    Returns:
+        dict: Параметры замера и показатели по сценариям.
+    """
+    users = User.objects.filter(phone_number__startswith=BENCHMARK_PHONE_PREFIX)
+    premium_user_ids = list(
+        users.filter(premium_until__isnull=False).values_list("pk", flat=True)
+    )
+    free_user_ids = list(
+        users.filter(premium_until__isnull=True).values_list("pk", flat=True)
+    )
+    blog_ids = list(Blog.objects.values_list("pk", flat=True))
+    free_blog_ids = list(
+        Blog.objects.filter(is_premium=False).values_list("pk", flat=True)
+    )
+    if not (premium_user_ids and free_user_ids and free_blog_ids):
+        raise ValueError("Нет данных для замера: выполните команду seed_benchmark")
+    scenario = _Scenario(host, free_blog_ids, premium_user_ids, free_user_ids)
+
+    fake_stripe = FakeStripeClient(latency=stripe_latency, paid_ratio=stripe_paid_ratio)
+    original_client = stripe.default_http_client
+    stripe.default_http_client = fake_stripe
+    results = {}
+    try:
+        for name in scenarios:
+            if name == "checkout_jobs":
+                pending_jobs = Job.objects.filter(status=Job.PENDING).count()
+                results[name] = run_scenario(scenario, name, concurrency, pending_jobs)
+            else:
+                results[name] = run_scenario(scenario, name, concurrency, requests)
+    finally:
+        stripe.default_http_client = original_client
+        flush_view_counts()
+
+    return {
+        "commit": get_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "database": connections["default"].vendor,
+        "parameters": {
+            "concurrency": concurrency,
+            "requests": requests,
+            "stripe_latency": stripe_latency,
+            "stripe_paid_ratio": stripe_paid_ratio,
+        },
+        "data": {
+            "posts": len(blog_ids),
+            "premium_users": len(premium_user_ids),
+            "free_users": len(free_user_ids),
+        },
+        "stripe_calls": fake_stripe.calls,
+        "results": results,
+    }
+
+
+def compare_results(baseline, current):
+    """
+    Сравнивает показатели двух замеров по сценариям.
+
+    Returns:
+        list: Кортежи (сценарий, показатель, было, стало, изменение в процентах).
+    """
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        for metric, old, new in (
+            ("rps", before["rps"], result["rps"]),
+            ("p95_ms", before["latency_ms"]["p95"], result["latency_ms"]["p95"]),
+            ("queries", before["queries"]["mean"], result["queries"]["mean"]),
+        ):
+            change = round((new - old) * 100 / old, 1) if old else None
+            rows.append((name, metric, old, new, change))
+    return rows
@@ -0,0 +1,124 @@
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = "renditions"
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+
+def get_rendition_name(source_name, width, extension):
+    """
+    Возвращает путь уменьшенной копии изображения в хранилище.
+
+    Args:
+        source_name (str): Путь исходного изображения в хранилище.
+        width (int): Ширина копии в пикселях.
+        extension (str): Расширение файла копии.
+
+    Returns:
+        str: Путь копии, например "renditions/preview/photo-640w.webp".
+    """
+    stem = posixpath.splitext(source_name)[0]
+    return posixpath.join(RENDITIONS_DIR, f"{stem}-{width}w.{extension}")
+
+
+def generate_renditions(image_file):
+    """
+    Создает копии изображения фиксированной ширины в исходном формате и в WebP.
+
+    Копии шире исходного изображения не создаются. Уже созданная копия
+    пересоздается только если исходный файл новее нее.
+
+    Args:
+        image_file (FieldFile): Файл из ImageField.
+
+    Returns:
+        list: Кортежи (ширина, путь копии, путь копии WebP), по возрастанию ширины.
+    """
+    storage = image_file.storage
+    source_modified = storage.get_modified_time(image_file.name)
+
+    with storage.open(image_file.name) as source, Image.open(source) as image:
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        fallback_format, extension = ("PNG", "png") if has_alpha else ("JPEG", "jpg")
+        widths = [
+            width for width in settings.IMAGE_RENDITION_WIDTHS if width < image.width
+        ]
+
+        renditions = []
+        for width in widths:
+            name = get_rendition_name(image_file.name, width, extension)
+            webp_name = get_rendition_name(image_file.name, width, "webp")
+            resized = None
+            for target, image_format in ((name, fallback_format), (webp_name, "WEBP")):
+                if (
+                    storage.exists(target)
+                    and storage.get_modified_time(target) >= source_modified
+                ):
+                    continue
+                if resized is None:
+                    height = round(image.height * width / image.width)
+                    resized = image.convert("RGBA" if has_alpha else "RGB").resize(
+                        (width, height), Image.LANCZOS
+                    )
+                _save_image(storage, target, resized, image_format)
+            renditions.append((width, name, webp_name))
+    return renditions
+
+
+def _save_image(storage, name, image, image_format):
+    buffer = BytesIO()
+    quality = WEBP_QUALITY if image_format == "WEBP" else JPEG_QUALITY
+    image.save(buffer, image_format, quality=quality, optimize=True)
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def refresh_renditions(image_file):
+    """
+    Создает недостающие или устаревшие копии изображения и обновляет кэш.
+
+    Args:
+        image_file (FieldFile): Файл из ImageField.
+
+    Returns:
+        list: Кортежи (ширина, путь копии, путь копии WebP) или пустой список,
+            если изображение недоступно.
+    """
+    try:
+        renditions = generate_renditions(image_file)
+    except (OSError, UnidentifiedImageError):
+        logger.warning("Не удалось создать копии изображения %s", image_file.name)
+        return []
+    cache.set(f"renditions:{image_file.name}", renditions, None)
+    return renditions
+
+
+def get_renditions(image_file):
+    """
+    Возвращает копии изображения, создавая их при первом обращении.
+
+    Список копий кэшируется по пути исходного файла, поэтому повторные
+    обращения не читают диск. Новый загруженный файл получает новый путь
+    и новый список копий.
+
+    Args:
+        image_file (FieldFile): Файл из ImageField.
+
+    Returns:
+        list: Кортежи (ширина, путь копии, путь копии WebP) или пустой список,
+            если изображение недоступно.
+    """
+    renditions = cache.get(f"renditions:{image_file.name}")
+    if renditions is None:
+        renditions = refresh_renditions(image_file)
+    return renditions
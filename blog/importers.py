@@ -0,0 +1,184 @@
+"""
+Потоковый импорт статей из JSONL и CSV.
+
+Файл читается построчно (users.importers.iter_records) и записывается
+пачками через bulk_create. Владельцы статей ищутся по телефону в словаре,
+построенном один раз до импорта, а не запросом на каждую статью.
+Изображения статей копируются в хранилище параллельно.
+
+bulk_create не вызывает сигналы (blog.signals), поэтому их работа
+выполняется здесь или откладывается:
+- поисковые векторы пересчитываются для каждой пачки;
+- уменьшенные копии скопированных изображений создаются сразу после
+  копирования, для изображений, уже лежащих в хранилище, - при первом показе;
+- кэш ленты сбрасывается в конце импорта, у новых статей страниц в кэше
+  еще нет;
+- похожие статьи для новых статей посчитает следующий запуск
+  compute_related_posts.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from functools import partial
+
+from django.core.files import File
+from django.db import reset_queries, transaction
+from django.utils import timezone
+
+from blog.images import refresh_renditions
+from blog.models import Blog
+from blog.search import update_search_vectors
+from blog.services import invalidate_page_cache
+from users.importers import IMPORT_BATCH_SIZE, batched, iter_records, parse_bool
+from users.models import User
+
+logger = logging.getLogger(__name__)
+
+# Сколько изображений копируется одновременно
+IMPORT_PREVIEW_WORKERS = 8
+
+
+def load_owner_map():
+    """
+    Возвращает словарь {телефон: id пользователя} для поиска владельцев статей.
+    """
+    return dict(
+        User.objects.values_list("phone_number", "pk").iterator(chunk_size=10000)
+    )
+
+
+def copy_preview(media_source, name):
+    """
+    Копирует изображение статьи из каталога media_source в хранилище и
+    создает его уменьшенные копии.
+
+    Args:
+        media_source (str): Каталог с исходными изображениями.
+        name (str): Путь изображения относительно media_source.
+
+    Returns:
+        str | None: Путь файла в хранилище или None, если файла нет.
+    """
+    if not name:
+        return None
+    field = Blog._meta.get_field("preview")
+    try:
+        with open(os.path.join(media_source, name), "rb") as file:
+            target = field.generate_filename(None, os.path.basename(name))
+            saved = field.storage.save(target, File(file))
+    except OSError:
+        logger.warning("Не удалось скопировать изображение %s", name)
+        return None
+    refresh_renditions(field.attr_class(None, field, saved))
+    return saved
+
+
+def build_blog(record, owners, today):
+    """
+    Создает объект статьи из записи импорта без сохранения.
+
+    Args:
+        record (dict): Поля title (обязательно), content, owner (телефон
+            владельца), count_view, is_premium, created_at (дата ISO), preview.
+        owners (dict): Словарь {телефон: id пользователя} (см. load_owner_map).
+        today (date): Дата публикации для записей без created_at.
+
+    Returns:
+        Blog: Несохраненная статья.
+    """
+    title = (record.get("title") or "").strip()
+    if not title:
+        raise ValueError("не указан title")
+    owner = (record.get("owner") or "").strip()
+    if owner and owner not in owners:
+        raise ValueError(f"неизвестный владелец {owner!r}")
+    created_at = record.get("created_at")
+    return Blog(
+        title=title[:100],
+        content=record.get("content") or "",
+        owner_id=owners.get(owner),
+        count_view=int(record.get("count_view") or 0),
+        is_premium=parse_bool(record.get("is_premium", False)),
+        created_at=date.fromisoformat(created_at[:10]) if created_at else today,
+        preview=record.get("preview") or None,
+    )
+
+
+@contextmanager
+def _keep_created_at():
+    # Дата публикации заполняется при создании (auto_now_add) и затерла бы
+    # дату из файла. На время импорта в процессе команды это отключается.
+    field = Blog._meta.get_field("created_at")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def import_blogs(
+    path,
+    file_format=None,
+    batch_size=IMPORT_BATCH_SIZE,
+    media_source=None,
+    workers=IMPORT_PREVIEW_WORKERS,
+    progress=None,
+):
+    """
+    Импортирует статьи из файла пачками.
+
+    Каждая пачка записывается в своей транзакции вместе с поисковыми
+    векторами. Если указан media_source, изображения из поля preview
+    копируются оттуда в хранилище, иначе preview считается путем уже
+    в хранилище.
+
+    Args:
+        path (str): Путь к файлу JSONL или CSV.
+        file_format (str): Формат файла; по умолчанию по расширению.
+        batch_size (int): Размер пачки bulk_create.
+        media_source (str): Каталог с изображениями статей.
+        workers (int): Сколько изображений копировать одновременно.
+        progress (callable): Вызывается с количеством прочитанных записей после каждой пачки.
+
+    Returns:
+        dict: Количество прочитанных записей и созданных статей.
+
+    Raises:
+        ValueError: Если запись не удалось разобрать; в сообщении номер строки.
+    """
+    owners = load_owner_map()
+    today = timezone.localdate()
+    read = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor, _keep_created_at():
+        for batch in batched(iter_records(path, file_format), batch_size):
+            blogs = []
+            for line_number, record in batch:
+                try:
+                    blogs.append(build_blog(record, owners, today))
+                except (ValueError, TypeError) as error:
+                    raise ValueError(f"Строка {line_number}: {error}") from error
+
+            if media_source:
+                names = [blog.preview.name for blog in blogs]
+                for blog, name in zip(
+                    blogs, executor.map(partial(copy_preview, media_source), names)
+                ):
+                    blog.preview = name
+
+            with transaction.atomic():
+                created = Blog.objects.bulk_create(blogs)
+                ids = [blog.pk for blog in created if blog.pk is not None]
+                if ids:
+                    update_search_vectors(Blog.objects.filter(pk__in=ids))
+            # При DEBUG=True Django запоминает текст каждого запроса, а запросы
+            # bulk_create большие: без очистки память росла бы с размером файла
+            reset_queries()
+            read += len(batch)
+            if progress:
+                progress(read)
+
+    invalidate_page_cache("list")
+    return {"read": read, "created": read}
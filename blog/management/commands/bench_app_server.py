@@ -0,0 +1,203 @@
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from blog.benchmark import percentile
+from config.health import LIVENESS_PATH
+
+DEFAULT_PATHS = (LIVENESS_PATH, "/", "/api/blogs/", "/static/css/bootstrap.min.css")
+
+
+class Command(BaseCommand):
+    """
+    Django команда для сравнения gunicorn (config/gunicorn.conf.py) с runserver.
+
+    По очереди запускает оба сервера на локальных портах с текущими
+    настройками (DJANGO_SETTINGS_MODULE) и выполняет одинаковую нагрузку по
+    HTTP из нескольких потоков с постоянными соединениями. Для честного
+    сравнения запускайте с config.settings_production после collectstatic:
+    тогда статические файлы в gunicorn отдает WhiteNoise со сжатыми копиями.
+
+    Methods:
+        handle: Основной метод команды, который выводит результаты замера.
+    """
+
+    help = "Сравнивает запросы в секунду и задержки gunicorn и runserver"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            action="append",
+            help="Адрес для замера, можно указать несколько раз",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=16, help="Количество потоков"
+        )
+        parser.add_argument(
+            "--requests", type=int, default=2000, help="Запросов на каждый адрес"
+        )
+        parser.add_argument(
+            "--port", type=int, default=8091, help="Порт для запуска серверов"
+        )
+        parser.add_argument("--output", help="Файл для сохранения результата в JSON")
+
+    def handle(self, *args, **options):
+        local_cache = settings.CACHES["default"]["BACKEND"].endswith(".LocMemCache")
+        if local_cache and os.getenv("WEB_WORKERS") != "1":
+            raise CommandError(
+                "gunicorn не запускает несколько рабочих процессов с LocMemCache: "
+                "укажите общий кэш в CACHE_BACKEND и CACHE_LOCATION или WEB_WORKERS=1"
+            )
+        port = options["port"]
+        servers = {
+            "runserver": [
+                sys.executable,
+                "manage.py",
+                "runserver",
+                "--noreload",
+                "--insecure",
+                f"127.0.0.1:{port}",
+            ],
+            "gunicorn": [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "-c",
+                "config/gunicorn.conf.py",
+                "--bind",
+                f"127.0.0.1:{port}",
+            ],
+        }
+        # Журнал запросов выключен, чтобы не замерять запись в него
+        env = {**os.environ, "WEB_ACCESS_LOG": ""}
+        if not env.get("ALLOWED_HOSTS"):
+            env["ALLOWED_HOSTS"] = "127.0.0.1"
+
+        results = {}
+        for name, command in servers.items():
+            process = subprocess.Popen(
+                command,
+                cwd=settings.BASE_DIR,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                self.wait_ready(port)
+                results[name] = {
+                    path: self.measure(
+                        port, path, options["concurrency"], options["requests"]
+                    )
+                    for path in options["path"] or DEFAULT_PATHS
+                }
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+        for path in results["gunicorn"]:
+            self.stdout.write(path)
+            for name, server_results in results.items():
+                stats = server_results[path]
+                self.stdout.write(
+                    f"  {name}: {stats['rps']} запр/с, p50 {stats['p50_ms']} мс, "
+                    f"p95 {stats['p95_ms']} мс, p99 {stats['p99_ms']} мс, "
+                    f"{stats['bytes']} байт, ошибок {stats['errors']}"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "cpus": os.cpu_count(),
+                        "options": {
+                            key: options[key] for key in ("concurrency", "requests")
+                        },
+                        "results": results,
+                    },
+                    file,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+
+    def wait_ready(self, port, timeout=30):
+        """
+        Ждет, пока сервер начнет отвечать на проверку LIVENESS_PATH.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                connection.request("GET", LIVENESS_PATH)
+                if connection.getresponse().status == 200:
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Сервер на порту {port} не запустился за {timeout} с")
+
+    def measure(self, port, path, concurrency, requests):
+        """
+        Выполняет requests запросов к path в concurrency потоков.
+
+        Returns:
+            dict: Запросы в секунду, задержки p50/p95/p99, размер ответа и ошибки.
+        """
+        headers = {"Accept-Encoding": "br, gzip", "Host": "127.0.0.1"}
+
+        def worker(count):
+            samples = []
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            for _ in range(count):
+                started = time.perf_counter()
+                body, ok = b"", False
+                # Сервер может закрыть постоянное соединение (перезапуск рабочего
+                # процесса gunicorn по max_requests), тогда запрос повторяется
+                # в новом соединении, как это делают браузеры
+                for attempt in range(2):
+                    try:
+                        connection.request("GET", path, headers=headers)
+                        response = connection.getresponse()
+                        body = response.read()
+                        ok = response.status == 200
+                        if response.getheader("Connection", "").lower() == "close":
+                            connection.close()
+                        break
+                    except (
+                        http.client.RemoteDisconnected,
+                        ConnectionResetError,
+                        BrokenPipeError,
+                    ):
+                        connection.close()
+                    except (OSError, http.client.HTTPException):
+                        connection.close()
+                        break
+                samples.append((time.perf_counter() - started, len(body), ok))
+            connection.close()
+            return samples
+
+        counts = [
+            requests // concurrency + (worker < requests % concurrency)
+            for worker in range(concurrency)
+        ]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            started = time.perf_counter()
+            samples = [
+                sample for batch in executor.map(worker, counts) for sample in batch
+            ]
+            elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency * 1000 for latency, _, _ in samples)
+        return {
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "bytes": max((size for _, size, _ in samples), default=0),
+            "errors": sum(1 for _, _, ok in samples if not ok),
+        }
@@ -0,0 +1,79 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import BaseCommand
+from django.db import close_old_connections, connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+from blog.views import BlogListAPIView
+
+
+class Command(BaseCommand):
+    """
+    Django команда для замера затрат на соединение с базой в каждом запросе.
+
+    Выполняет запросы к ленте статей в формате JSON так же, как обработчик
+    Django: с закрытием устаревших соединений до и после запроса. Замер
+    выполняется без постоянных соединений (CONN_MAX_AGE=0) и с ними.
+
+    Methods:
+        handle: Основной метод команды, который выводит результаты замера.
+    """
+
+    help = "Сравнивает время запроса с новым и с постоянным соединением к базе"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Количество запросов"
+        )
+        parser.add_argument(
+            "--conn-max-age",
+            type=int,
+            default=600,
+            help="CONN_MAX_AGE для постоянных соединений",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Выводит среднее время запроса и количество открытых соединений для каждого режима.
+        """
+        original = connection.settings_dict["CONN_MAX_AGE"]
+        try:
+            for conn_max_age in (0, options["conn_max_age"]):
+                elapsed, opened = self.run(options["requests"], conn_max_age)
+                self.stdout.write(
+                    f"CONN_MAX_AGE={conn_max_age}: "
+                    f"{elapsed * 1000 / options['requests']:.2f} мс на запрос, "
+                    f"открыто соединений: {opened}"
+                )
+        finally:
+            connection.settings_dict["CONN_MAX_AGE"] = original
+            connection.close()
+
+    def run(self, count, conn_max_age):
+        """
+        Выполняет count запросов и возвращает общее время и количество новых соединений.
+        """
+        connection.close()
+        connection.settings_dict["CONN_MAX_AGE"] = conn_max_age
+        view = BlogListAPIView.as_view()
+        factory = RequestFactory()
+        opened = 0
+
+        def count_connection(**kwargs):
+            nonlocal opened
+            opened += 1
+
+        connection_created.connect(count_connection)
+        try:
+            started = time.perf_counter()
+            for _ in range(count):
+                request = factory.get("/api/blogs/")
+                request.user = AnonymousUser()
+                close_old_connections()
+                view(request).render()
+                close_old_connections()
+            return time.perf_counter() - started, opened
+        finally:
+            connection_created.disconnect(count_connection)
@@ -0,0 +1,66 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+
+from blog.related import RELATED_BATCH_SIZE, RELATED_TOP_K, compute_related_posts
+
+
+class Command(BaseCommand):
+    """
+    Django команда для пересчета похожих статей.
+
+    Запускается по расписанию (например, cron раз в час) или сама повторяет
+    пересчет каждые --interval секунд. По умолчанию пересчитывает только
+    статьи, созданные или измененные после прошлого запуска.
+
+    Methods:
+        handle: Основной метод команды, который пересчитывает похожие статьи.
+    """
+
+    help = "Пересчитывает похожие статьи по TF-IDF"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k", type=int, default=RELATED_TOP_K, help="Похожих статей на статью"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=RELATED_BATCH_SIZE, help="Размер пачки"
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Пересчитать все статьи и обновить словарь",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Повторять пересчет каждые N секунд (0 - один раз)",
+        )
+        parser.add_argument(
+            "--full-interval",
+            type=int,
+            default=0,
+            help="При повторах выполнять полный пересчет раз в N секунд",
+        )
+
+    def handle(self, *args, **options):
+        full = options["full"]
+        last_full = time.monotonic()
+        while True:
+            if full:
+                last_full = time.monotonic()
+            changed = compute_related_posts(
+                top_k=options["top_k"],
+                batch_size=options["batch_size"],
+                full=full,
+            )
+            self.stdout.write(f"Обновлены похожие статьи для {changed} статей")
+            if not options["interval"]:
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
+            full = bool(options["full_interval"]) and (
+                time.monotonic() - last_full >= options["full_interval"]
+            )
@@ -0,0 +1,68 @@
+from django.core.management import BaseCommand, CommandError
+
+from blog.importers import IMPORT_PREVIEW_WORKERS, import_blogs
+from users.importers import IMPORT_BATCH_SIZE, IMPORT_FORMATS
+
+
+class Command(BaseCommand):
+    """
+    Django команда для импорта статей из JSONL или CSV.
+
+    Файл читается построчно и записывается пачками, поэтому подходит для
+    миллионов строк. Владельцы статей (поле owner - телефон) должны быть
+    импортированы заранее командой import_users.
+
+    Methods:
+        handle: Основной метод команды, который выполняет импорт.
+    """
+
+    help = "Импортирует статьи из файла JSONL или CSV (можно сжатого gzip)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Формат файла (по умолчанию по расширению)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Размер пачки bulk_create",
+        )
+        parser.add_argument(
+            "--media-source",
+            help="Каталог с изображениями статей для копирования в хранилище",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=IMPORT_PREVIEW_WORKERS,
+            help="Сколько изображений копировать одновременно",
+        )
+
+    def handle(self, *args, **options):
+        progress = self.write_progress if options["verbosity"] > 1 else None
+        try:
+            result = import_blogs(
+                options["path"],
+                file_format=options["format"],
+                batch_size=options["batch_size"],
+                media_source=options["media_source"],
+                workers=options["workers"],
+                progress=progress,
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Прочитано записей: {result['read']}, создано статей: {result['created']}"
+            )
+        )
+
+    def write_progress(self, read):
+        """
+        Выводит количество прочитанных записей после каждой пачки.
+        """
+        self.stdout.write(f"Прочитано записей: {read}")
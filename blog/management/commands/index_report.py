@@ -0,0 +1,123 @@
+import re
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.models import Blog
+from blog.pagination import BLOG_ORDERING, BLOG_PAGE_SIZE
+from blog.search import is_full_text_supported, search_blogs
+from users.models import Job, Subscription
+
+# Признаки полного просмотра таблицы в выводе EXPLAIN
+SEQ_SCAN_PATTERNS = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"\bSCAN (\w+)\b(?! USING)"),
+}
+
+
+def get_hot_querysets():
+    """
+    Возвращает запросы, которые выполняются на каждой странице блога.
+
+    Returns:
+        dict: Название запроса и QuerySet.
+    """
+    page = BLOG_PAGE_SIZE + 1
+    querysets = {
+        "Лента для неавторизованных": Blog.objects.for_list(AnonymousUser())
+        .filter(is_premium=False)
+        .order_by(*BLOG_ORDERING)[:page],
+        "Лента для авторизованных": Blog.objects.order_by(*BLOG_ORDERING)[:page],
+        "Статьи владельца": Blog.objects.filter(owner_id=1).order_by("-created_at")[
+            :page
+        ],
+        "Статья по id": Blog.objects.filter(pk=1),
+        "Подписка по сессии Stripe": Subscription.objects.filter(content_id="cs_test"),
+        "Очередь задач": Job.objects.filter(
+            status=Job.PENDING, run_at__lte=timezone.now()
+        ).order_by("run_at")[:1],
+    }
+    if is_full_text_supported(connection.alias):
+        querysets["Поиск по статьям"] = search_blogs(Blog.objects.all(), "статья")
+    return querysets
+
+
+class Command(BaseCommand):
+    """
+    Django команда для проверки индексов на горячих запросах блога.
+
+    Для каждого запроса выполняет EXPLAIN и сообщает о полных просмотрах таблиц.
+    На PostgreSQL план строится с отключенным Seq Scan, поэтому полный просмотр
+    в плане означает, что подходящего индекса нет. Также выводятся индексы,
+    которые ни разу не использовались (по pg_stat_user_indexes).
+
+    Methods:
+        handle: Основной метод команды, который выводит отчет.
+    """
+
+    help = "Отчет об отсутствующих и неиспользуемых индексах"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose-plans", action="store_true", help="Выводить планы запросов"
+        )
+
+    def handle(self, *args, **options):
+        """
+        Выводит отчет по индексам.
+        """
+        pattern = SEQ_SCAN_PATTERNS.get(connection.vendor)
+        missing = 0
+        for name, queryset in get_hot_querysets().items():
+            plan = self.explain(queryset)
+            if options["verbose_plans"]:
+                self.stdout.write(plan)
+            tables = sorted(set(pattern.findall(plan))) if pattern else []
+            if tables:
+                missing += 1
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{name}: полный просмотр таблицы {', '.join(tables)}"
+                    )
+                )
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{name}: используется индекс"))
+
+        if connection.vendor == "postgresql":
+            for table, index in self.unused_indexes():
+                self.stdout.write(
+                    self.style.WARNING(f"Индекс {index} на {table} не используется")
+                )
+
+        if missing:
+            self.stdout.write(self.style.WARNING(f"Запросов без индекса: {missing}"))
+
+    def explain(self, queryset):
+        """
+        Возвращает план запроса. На PostgreSQL Seq Scan отключается на время EXPLAIN.
+        """
+        if connection.vendor != "postgresql":
+            return queryset.explain()
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
+
+    def unused_indexes(self):
+        """
+        Возвращает индексы таблиц блога, которые не использовались с момента сброса статистики.
+        """
+        tables = [Blog._meta.db_table, Subscription._meta.db_table, Job._meta.db_table]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT s.relname, s.indexrelname
+                FROM pg_stat_user_indexes s
+                JOIN pg_index i ON i.indexrelid = s.indexrelid
+                WHERE s.idx_scan = 0 AND NOT i.indisprimary AND s.relname = ANY(%s)
+                ORDER BY s.relname, s.indexrelname
+                """,
+                [tables],
+            )
+            return cursor.fetchall()
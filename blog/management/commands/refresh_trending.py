@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+
+from blog.trending import prune_view_stats, refresh_trending
+
+
+class Command(BaseCommand):
+    """
+    Django команда для пересчета рейтинга популярных статей.
+
+    Без --once пересчитывает рейтинг каждые TRENDING_REFRESH_INTERVAL секунд.
+    Чтобы страницы читали пересчитанный рейтинг, кэш (CACHE_BACKEND) должен
+    быть общим для приложения и этой команды.
+
+    Methods:
+        handle: Основной метод команды, который пересчитывает рейтинг.
+    """
+
+    help = "Пересчитывает рейтинг популярных статей и удаляет старую статистику"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Пересчитать один раз и завершиться"
+        )
+
+    def handle(self, *args, **options):
+        interval = settings.TRENDING_REFRESH_INTERVAL
+        while True:
+            # Рейтинг живет в кэше дольше интервала, чтобы страницы не
+            # пересчитывали его сами, пока команда работает
+            trending = refresh_trending(timeout=interval * 2)
+            pruned = prune_view_stats()
+            self.stdout.write(
+                f"Статей в рейтинге: {len(trending)}, удалено строк статистики: {pruned}"
+            )
+            if options["once"]:
+                break
+            close_old_connections()
+            time.sleep(interval)
@@ -0,0 +1,88 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from blog.benchmark import SCENARIOS, compare_results, run_benchmark
+
+
+class Command(BaseCommand):
+    """
+    Django команда для нагрузочного тестирования представлений.
+
+    Выполняет сценарии нагрузки на данных команды seed_benchmark, выводит
+    показатели и сохраняет их в JSON. С --compare сравнивает результат с
+    сохраненным ранее замером.
+
+    Methods:
+        handle: Основной метод команды, который выполняет замер.
+    """
+
+    help = "Замеряет запросы в секунду, задержки и запросы к базе под нагрузкой"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=SCENARIOS,
+            help="Сценарий замера, можно указать несколько раз (по умолчанию все)",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Количество потоков"
+        )
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Запросов в каждом сценарии"
+        )
+        parser.add_argument(
+            "--stripe-latency",
+            type=float,
+            default=0.05,
+            help="Задержка ответа Stripe в секундах",
+        )
+        parser.add_argument(
+            "--stripe-paid-ratio",
+            type=float,
+            default=0.0,
+            help="Доля сессий оплаты, которые Stripe считает оплаченными",
+        )
+        parser.add_argument(
+            "--host",
+            default="127.0.0.1",
+            help="Заголовок Host запросов (из ALLOWED_HOSTS)",
+        )
+        parser.add_argument("--output", help="Файл для сохранения результата в JSON")
+        parser.add_argument(
+            "--compare", help="Файл с прошлым результатом для сравнения"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = run_benchmark(
+                scenarios=options["scenario"] or SCENARIOS,
+                concurrency=options["concurrency"],
+                requests=options["requests"],
+                stripe_latency=options["stripe_latency"],
+                stripe_paid_ratio=options["stripe_paid_ratio"],
+                host=options["host"],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        for name, stats in result["results"].items():
+            latency = stats["latency_ms"]
+            self.stdout.write(
+                f"{name}: {stats['rps']} запр/с, p50 {latency['p50']} мс, "
+                f"p95 {latency['p95']} мс, p99 {latency['p99']} мс, "
+                f"запросов к базе {stats['queries']['mean']}, ошибок {stats['errors']}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(result, file, ensure_ascii=False, indent=2)
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                baseline = json.load(file)
+            self.stdout.write(f"Сравнение с коммитом {baseline.get('commit')}:")
+            for name, metric, old, new, change in compare_results(baseline, result):
+                change = "н/д" if change is None else f"{change:+}%"
+                self.stdout.write(f"  {name} {metric}: {old} -> {new} ({change})")
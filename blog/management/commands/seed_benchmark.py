@@ -0,0 +1,61 @@
+from django.core.management import BaseCommand
+
+from blog.benchmark import seed_data
+
+
+class Command(BaseCommand):
+    """
+    Django команда для наполнения базы данными нагрузочного тестирования.
+
+    Прежние данные замера (пользователи с телефонами BENCHMARK_PHONE_PREFIX и
+    их статьи) удаляются перед наполнением.
+
+    Methods:
+        handle: Основной метод команды, который создает статьи и пользователей.
+    """
+
+    help = "Создает статьи и пользователей с подписками для команды run_benchmark"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--posts", type=int, default=100_000, help="Количество статей"
+        )
+        parser.add_argument(
+            "--users", type=int, default=10_000, help="Количество пользователей"
+        )
+        parser.add_argument(
+            "--paid-ratio",
+            type=float,
+            default=0.3,
+            help="Доля пользователей с оплаченной подпиской",
+        )
+        parser.add_argument(
+            "--pending-ratio",
+            type=float,
+            default=0.2,
+            help="Доля пользователей с неоплаченной сессией оплаты",
+        )
+        parser.add_argument(
+            "--premium-post-ratio", type=float, default=0.3, help="Доля платных статей"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=2000, help="Размер пачки bulk_create"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Начальное значение генератора"
+        )
+
+    def handle(self, *args, **options):
+        created = seed_data(
+            posts=options["posts"],
+            users=options["users"],
+            paid_ratio=options["paid_ratio"],
+            pending_ratio=options["pending_ratio"],
+            premium_post_ratio=options["premium_post_ratio"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            f"Создано статей: {created['posts']}, пользователей: {created['users']} "
+            f"(с оплатой: {created['paid']}, с неоплаченной сессией: {created['pending']})"
+        )
@@ -0,0 +1,38 @@
+from django.core.management import BaseCommand
+
+from blog.models import Blog
+from blog.search import is_full_text_supported, update_search_vectors
+
+
+class Command(BaseCommand):
+    """
+    Django команда для пересчета поисковых векторов статей.
+
+    Нужна после смены BLOG_SEARCH_CONFIG или после загрузки статей в обход
+    save(). Статьи обновляются пачками по диапазону id, чтобы не держать
+    долгую блокировку всей таблицы.
+
+    Methods:
+        handle: Основной метод команды, который пересчитывает векторы.
+    """
+
+    help = "Пересчитывает поисковые векторы статей"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=5000, help="Статей в одном UPDATE"
+        )
+
+    def handle(self, *args, **options):
+        if not is_full_text_supported(Blog.objects.db):
+            self.stdout.write("Полнотекстовый поиск доступен только в PostgreSQL")
+            return
+
+        batch_size = options["batch_size"]
+        last_id = Blog.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        updated = 0
+        for start in range(0, last_id, batch_size):
+            updated += update_search_vectors(
+                Blog.objects.filter(pk__gt=start, pk__lte=start + batch_size)
+            )
+        self.stdout.write(f"Обновлено статей: {updated}")
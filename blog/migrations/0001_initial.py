@@ -0,0 +1,64 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Blog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("title", models.CharField(max_length=100, verbose_name="Заголовок")),
+                ("content", models.TextField(verbose_name="Содержимое статьи")),
+                (
+                    "preview",
+                    models.ImageField(
+                        blank=True,
+                        null=True,
+                        upload_to="preview/",
+                        verbose_name="Изображение",
+                    ),
+                ),
+                (
+                    "count_view",
+                    models.IntegerField(
+                        default=0, verbose_name="Количество просмотров"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateField(auto_now_add=True, verbose_name="Дата публикации"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата изменения"),
+                ),
+                (
+                    "is_premium",
+                    models.BooleanField(default=False, verbose_name="Платный контент"),
+                ),
+            ],
+            options={
+                "verbose_name": "Статья",
+                "verbose_name_plural": "Статьи",
+                "permissions": [
+                    ("can_edit_title", "Can edit title"),
+                    ("can_edit_content", "Can edit content"),
+                ],
+            },
+        ),
+    ]
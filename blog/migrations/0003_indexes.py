@@ -0,0 +1,52 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from blog.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+    # Индексы создаются через CREATE INDEX CONCURRENTLY (см. blog.operations)
+    atomic = False
+
+    dependencies = [
+        ("blog", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name="blog",
+            index=models.Index(fields=["-created_at", "-id"], name="blog_created_idx"),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name="blog",
+            index=models.Index(
+                condition=models.Q(("is_premium", False)),
+                fields=["-created_at", "-id"],
+                name="blog_public_created_idx",
+            ),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name="blog",
+            index=models.Index(
+                fields=["owner", "-created_at"], name="blog_owner_created_idx"
+            ),
+        ),
+        # Индекс внешнего ключа удаляется после создания заменяющего его
+        # составного индекса (owner, created_at)
+        migrations.AlterField(
+            model_name="blog",
+            name="owner",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Владелец",
+            ),
+        ),
+    ]
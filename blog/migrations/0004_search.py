@@ -0,0 +1,53 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:09
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+from blog.operations import AddPostgresIndexConcurrently
+
+
+def fill_search_vector(apps, schema_editor):
+    """
+    Заполняет поисковый вектор уже опубликованных статей.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Blog = apps.get_model("blog", "Blog")
+    SearchVector = django.contrib.postgres.search.SearchVector
+    config = settings.BLOG_SEARCH_CONFIG
+    Blog.objects.using(schema_editor.connection.alias).update(
+        search_vector=SearchVector("title", weight="A", config=config)
+        + SearchVector("content", weight="B", config=config)
+    )
+
+
+class Migration(migrations.Migration):
+    # GIN-индекс создается через CREATE INDEX CONCURRENTLY (см. blog.operations)
+    atomic = False
+
+    dependencies = [
+        ("blog", "0003_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blog",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                blank=True, editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(
+            fill_search_vector, migrations.RunPython.noop, atomic=True
+        ),
+        # Индекс строится по уже заполненным векторам
+        AddPostgresIndexConcurrently(
+            model_name="blog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="blog_search_vector_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0004_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blog",
+            name="related_updated_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name="RelatedBlog",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("position", models.PositiveSmallIntegerField(verbose_name="Позиция")),
+                ("score", models.FloatField(verbose_name="Сходство")),
+                (
+                    "blog",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="neighbours",
+                        to="blog.blog",
+                        verbose_name="Статья",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="neighbour_of",
+                        to="blog.blog",
+                        verbose_name="Похожая статья",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Похожая статья",
+                "verbose_name_plural": "Похожие статьи",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="relatedblog",
+            constraint=models.UniqueConstraint(
+                fields=("blog", "position"), name="related_blog_position_uniq"
+            ),
+        ),
+    ]
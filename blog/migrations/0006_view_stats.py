@@ -0,0 +1,55 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0005_related_posts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlogViewStat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField(verbose_name="Час")),
+                (
+                    "views",
+                    models.PositiveIntegerField(default=0, verbose_name="Просмотры"),
+                ),
+                (
+                    "blog",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="view_stats",
+                        to="blog.blog",
+                        verbose_name="Статья",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Просмотры за час",
+                "verbose_name_plural": "Просмотры по часам",
+                "indexes": [
+                    models.Index(fields=["hour"], name="blog_view_stat_hour_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="blogviewstat",
+            constraint=models.UniqueConstraint(
+                fields=("blog", "hour"), name="blog_view_stat_hour_uniq"
+            ),
+        ),
+    ]
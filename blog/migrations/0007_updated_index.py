@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+from blog.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+    # Индекс создается через CREATE INDEX CONCURRENTLY (см. blog.operations)
+    atomic = False
+
+    dependencies = [
+        ("blog", "0006_view_stats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name="blog",
+            index=models.Index(fields=["updated_at"], name="blog_updated_idx"),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:40
+
+from django.db import migrations
+
+from blog.operations import RemoveIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+    # Индекс удаляется через DROP INDEX CONCURRENTLY (см. blog.operations)
+    atomic = False
+
+    dependencies = [
+        ("blog", "0007_updated_index"),
+    ]
+
+    operations = [
+        RemoveIndexConcurrentlyOnPostgres(
+            model_name="blog",
+            name="blog_updated_idx",
+        ),
+    ]
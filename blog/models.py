@@ -1,8 +1,85 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import BooleanField, Case, Q, Value, When
 
 from config.settings import NULLABLE
 
+# Поля, которые нужны для карточки статьи в ленте
+BLOG_LIST_FIELDS = (
+    "title",
+    "preview",
+    "count_view",
+    "created_at",
+    "updated_at",
+    "is_premium",
+    "owner__phone_number",
+)
+
+
+class BlogQuerySet(models.QuerySet):
+    """
+    QuerySet статей с выборками, подготовленными для ленты.
+
+    Methods:
+        for_list: Статьи для ленты с владельцем и правами пользователя.
+        with_permissions: Добавляет флаги can_view и can_edit для пользователя.
+    """
+
+    def for_list(self, user):
+        """
+        Возвращает статьи для ленты одним запросом.
+
+        Владелец подгружается через JOIN, содержимое статьи не выбирается,
+        права пользователя на каждую статью вычисляются в SQL.
+
+        Args:
+            user (User | AnonymousUser): Текущий пользователь.
+
+        Returns:
+            QuerySet: Статьи с флагами can_view и can_edit.
+        """
+        return (
+            self.select_related("owner")
+            .only(*BLOG_LIST_FIELDS)
+            .with_permissions(user)
+        )
+
+    def with_permissions(self, user):
+        """
+        Добавляет к статьям флаги can_view (доступ к статье) и can_edit
+        (редактирование и удаление).
+
+        Args:
+            user (User | AnonymousUser): Текущий пользователь.
+
+        Returns:
+            QuerySet: Статьи с флагами can_view и can_edit.
+        """
+        if user.is_superuser:
+            can_view = can_edit = True
+        elif user.is_authenticated:
+            if user.has_premium:
+                can_view = True
+            else:
+                can_view = Q(is_premium=False) | Q(owner=user)
+            can_edit = Q(owner=user)
+        else:
+            can_view = Q(is_premium=False)
+            can_edit = False
+        return self.annotate(can_view=_as_flag(can_view), can_edit=_as_flag(can_edit))
+
+
+def _as_flag(condition):
+    """
+    Превращает условие (Q или bool) в логическое SQL-выражение для annotate.
+    """
+    if isinstance(condition, bool):
+        return Value(condition, output_field=BooleanField())
+    return Case(When(condition, then=Value(True)), default=Value(False),
+                output_field=BooleanField())
+
 
 class Blog(models.Model):
     """
@@ -14,8 +91,13 @@ class Blog(models.Model):
         preview (ImageField): Изображение предпросмотра статьи (загружается в папку 'preview/').
         count_view (IntegerField): Количество просмотров статьи (по умолчанию 0).
         created_at (DateField): Дата публикации статьи (автоматически добавляется при создании).
+        updated_at (DateTimeField): Дата и время последнего изменения статьи.
         user (ForeignKey): Владелец статьи (ссылка на модель пользователя из настроек Django).
         price (IntegerField, optional): Цена на подписку (может быть пустым).
+        search_vector (SearchVectorField): Поисковый вектор заголовка и содержимого
+            (только PostgreSQL, см. blog.search).
+        related_updated_at (DateTimeField): Когда последний раз пересчитывались
+            похожие статьи (см. blog.related).
 
     Methods:
         __str__: Возвращает строковое представление объекта, используя заголовок статьи.
@@ -28,10 +110,20 @@ class Blog(models.Model):
     )
     count_view = models.IntegerField(default=0, verbose_name="Количество просмотров")
     created_at = models.DateField(auto_now_add=True, verbose_name="Дата публикации")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата изменения")
     owner = models.ForeignKey(
-        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name="Владелец", **NULLABLE
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        verbose_name="Владелец",
+        # Поиск по владельцу покрывает составной индекс (owner, created_at)
+        db_index=False,
+        **NULLABLE,
     )
     is_premium = models.BooleanField(default=False, verbose_name="Платный контент")
+    search_vector = SearchVectorField(editable=False, **NULLABLE)
+    related_updated_at = models.DateTimeField(editable=False, **NULLABLE)
+
+    objects = BlogQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.title}"
@@ -43,3 +135,88 @@ class Blog(models.Model):
             ("can_edit_title", "Can edit title"),
             ("can_edit_content", "Can edit content"),
         ]
+        indexes = [
+            # Лента для всех пользователей: ORDER BY created_at DESC, id DESC
+            models.Index(fields=["-created_at", "-id"], name="blog_created_idx"),
+            # Лента для неавторизованных: только бесплатные статьи
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=Q(is_premium=False),
+                name="blog_public_created_idx",
+            ),
+            # Статьи владельца, также используется для внешнего ключа owner
+            models.Index(fields=["owner", "-created_at"], name="blog_owner_created_idx"),
+            # Полнотекстовый поиск (создается только в PostgreSQL)
+            GinIndex(fields=["search_vector"], name="blog_search_vector_idx"),
+        ]
+
+
+class RelatedBlog(models.Model):
+    """
+    Похожая статья, найденная заранее командой compute_related_posts.
+
+    Attributes:
+        blog (ForeignKey): Статья, для которой подобрана похожая.
+        related (ForeignKey): Похожая статья.
+        position (PositiveSmallIntegerField): Место в списке похожих (0 - самая похожая).
+        score (FloatField): Косинусное сходство TF-IDF векторов статей.
+
+    Meta:
+        verbose_name (str): Отображаемое имя модели в единственном числе.
+        verbose_name_plural (str): Отображаемое имя модели во множественном числе.
+    """
+
+    blog = models.ForeignKey(
+        Blog, on_delete=models.CASCADE, related_name="neighbours", verbose_name="Статья"
+    )
+    related = models.ForeignKey(
+        Blog, on_delete=models.CASCADE, related_name="neighbour_of", verbose_name="Похожая статья"
+    )
+    position = models.PositiveSmallIntegerField(verbose_name="Позиция")
+    score = models.FloatField(verbose_name="Сходство")
+
+    def __str__(self):
+        return f"{self.blog_id} -> {self.related_id}"
+
+    class Meta:
+        verbose_name = "Похожая статья"
+        verbose_name_plural = "Похожие статьи"
+        constraints = [
+            # Страница статьи читает похожие статьи по (blog, position)
+            models.UniqueConstraint(fields=["blog", "position"], name="related_blog_position_uniq"),
+        ]
+
+
+class BlogViewStat(models.Model):
+    """
+    Количество просмотров статьи за один час.
+
+    Attributes:
+        blog (ForeignKey): Статья.
+        hour (DateTimeField): Начало часа (UTC).
+        views (PositiveIntegerField): Просмотры за этот час.
+
+    Meta:
+        verbose_name (str): Отображаемое имя модели в единственном числе.
+        verbose_name_plural (str): Отображаемое имя модели во множественном числе.
+    """
+
+    blog = models.ForeignKey(
+        Blog, on_delete=models.CASCADE, related_name="view_stats", verbose_name="Статья"
+    )
+    hour = models.DateTimeField(verbose_name="Час")
+    views = models.PositiveIntegerField(default=0, verbose_name="Просмотры")
+
+    def __str__(self):
+        return f"{self.blog_id} {self.hour}: {self.views}"
+
+    class Meta:
+        verbose_name = "Просмотры за час"
+        verbose_name_plural = "Просмотры по часам"
+        constraints = [
+            models.UniqueConstraint(fields=["blog", "hour"], name="blog_view_stat_hour_uniq"),
+        ]
+        indexes = [
+            # Рейтинг популярных статей читает просмотры за последние дни
+            models.Index(fields=["hour"], name="blog_view_stat_hour_idx"),
+        ]
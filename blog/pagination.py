@@ -0,0 +1,123 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+BLOG_PAGE_SIZE = 12
+
+# Порядок вывода статей: сначала новые, при равной дате - по убыванию id
+BLOG_ORDERING = ("-created_at", "-id")
+
+
+def encode_cursor(blog):
+    """
+    Кодирует позицию статьи в ленте в строку курсора.
+
+    Args:
+        blog (Blog): Последняя статья на странице.
+
+    Returns:
+        str: Курсор следующей страницы.
+    """
+    position = f"{blog.created_at.isoformat()}|{blog.pk}"
+    return urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Раскодирует курсор в позицию (created_at, id).
+
+    Args:
+        cursor (str): Строка курсора.
+
+    Returns:
+        tuple: Дата публикации и идентификатор статьи.
+
+    Raises:
+        ValueError: Если курсор поврежден.
+    """
+    try:
+        created_at, pk = urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return date.fromisoformat(created_at), int(pk)
+    except (TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Неверный курсор") from e
+
+
+def paginate_by_cursor(queryset, cursor, page_size=BLOG_PAGE_SIZE):
+    """
+    Возвращает страницу статей после позиции курсора.
+
+    Используется keyset-пагинация по (created_at, id): страница выбирается
+    условием WHERE без OFFSET и без подсчета общего количества строк, поэтому
+    любая страница стоит одинаково.
+
+    Args:
+        queryset (QuerySet): Статьи, доступные пользователю.
+        cursor (str | None): Курсор из предыдущей страницы.
+        page_size (int): Количество статей на странице.
+
+    Returns:
+        tuple: Список статей страницы и курсор следующей страницы (или None).
+
+    Raises:
+        ValueError: Если курсор поврежден.
+    """
+    queryset = queryset.order_by(*BLOG_ORDERING)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+    page = list(queryset[: page_size + 1])
+    if len(page) > page_size:
+        page = page[:page_size]
+        return page, encode_cursor(page[-1])
+    return page, None
+
+
+class BlogCursorPagination(BasePagination):
+    """
+    Keyset-пагинация статей для API.
+
+    Ответ содержит ссылку на следующую страницу и список статей, без общего
+    количества записей.
+    """
+
+    page_size = BLOG_PAGE_SIZE
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            page, self.next_cursor = paginate_by_cursor(
+                queryset,
+                request.query_params.get(self.cursor_query_param),
+                self.page_size,
+            )
+        except ValueError:
+            raise NotFound("Неверный курсор")
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,415 @@
+"""
+Подбор похожих статей по TF-IDF.
+
+Похожие статьи считаются заранее командой compute_related_posts и хранятся
+в таблице RelatedBlog, поэтому страница статьи читает их одним запросом.
+Пересчитываются только статьи, созданные или измененные после прошлого
+запуска (Blog.related_updated_at); остальные статьи получают их в свои
+списки похожих, если они ближе, чем уже найденные. Статьи, которые потеряли
+место в списке (похожая статья изменилась или удалена), получают новый
+список целиком.
+
+Сходство статей - косинус между их TF-IDF векторами. Векторы хранятся в
+разреженном виде и превращаются в плотные матрицы пачками, сходство пачки
+измененных статей со всеми статьями считается одним матричным умножением.
+
+Словарь, IDF и векторы сохраняются в файл RELATED_INDEX_PATH, поэтому
+обычный запуск читает и разбирает только измененные статьи. Словарь и IDF
+обновляются только полным пересчетом (--full); пока они не меняются, все
+хранимые оценки сходства сравнимы между собой.
+"""
+
+import os
+import re
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from blog.models import Blog, RelatedBlog
+from blog.services import invalidate_page_cache
+
+TOKEN_RE = re.compile(r"\w{2,}")
+
+# Слово из заголовка весит как TITLE_WEIGHT слов из содержимого
+TITLE_WEIGHT = 2
+
+# Сколько похожих статей хранится для каждой статьи
+RELATED_TOP_K = 5
+
+# Размер пачки статей в матричных операциях
+RELATED_BATCH_SIZE = 500
+
+# Размер словаря: самые частые слова, встречающиеся хотя бы в двух статьях
+RELATED_MAX_FEATURES = 20000
+
+
+def tokenize(title, content):
+    """
+    Возвращает частоты слов статьи с учетом веса заголовка.
+
+    Args:
+        title (str): Заголовок статьи.
+        content (str): Содержимое статьи.
+
+    Returns:
+        Counter: Частота каждого слова.
+    """
+    counts = Counter(TOKEN_RE.findall(content.lower()))
+    for token in TOKEN_RE.findall(title.lower()):
+        counts[token] += TITLE_WEIGHT
+    return counts
+
+
+def _iter_documents(batch_size, queryset=None):
+    queryset = (queryset if queryset is not None else Blog.objects).order_by("pk")
+    for pk, title, content in queryset.values_list("pk", "title", "content").iterator(
+        chunk_size=batch_size
+    ):
+        yield pk, tokenize(title, content)
+
+
+def build_vocabulary(batch_size=RELATED_BATCH_SIZE, max_features=RELATED_MAX_FEATURES):
+    """
+    Строит словарь и IDF слов по всем статьям.
+
+    Слова, которые встречаются только в одной статье, не влияют на сходство
+    и в словарь не входят.
+
+    Returns:
+        tuple: Словарь {слово: номер столбца} и массив IDF по столбцам.
+    """
+    document_frequency = Counter()
+    documents = 0
+    for _, counts in _iter_documents(batch_size):
+        document_frequency.update(counts.keys())
+        documents += 1
+
+    frequent = [
+        (token, df)
+        for token, df in document_frequency.most_common(max_features)
+        if df > 1
+    ]
+    vocabulary = {token: column for column, (token, _) in enumerate(frequent)}
+    df = np.array([df for _, df in frequent], dtype=np.float32)
+    idf = np.log((1 + documents) / (1 + df)) + 1
+    return vocabulary, idf
+
+
+def vectorize(counts, vocabulary, idf):
+    """
+    Возвращает нормированный TF-IDF вектор статьи в разреженном виде.
+
+    Args:
+        counts (Counter): Частоты слов статьи (см. tokenize).
+        vocabulary (dict): Словарь {слово: номер столбца}.
+        idf (ndarray): IDF по столбцам.
+
+    Returns:
+        tuple: Номера столбцов и веса.
+    """
+    tokens = [token for token in counts if token in vocabulary]
+    columns = np.array([vocabulary[token] for token in tokens], dtype=np.int32)
+    tf = np.array([counts[token] for token in tokens], dtype=np.float32)
+    weights = (1 + np.log(tf)) * idf[columns]
+    norm = np.linalg.norm(weights)
+    return columns, weights / norm if norm else weights
+
+
+def build_vectors(vocabulary, idf, batch_size=RELATED_BATCH_SIZE, queryset=None):
+    """
+    Возвращает нормированные TF-IDF векторы статей в разреженном виде.
+
+    Args:
+        vocabulary (dict): Словарь {слово: номер столбца}.
+        idf (ndarray): IDF по столбцам.
+        batch_size (int): Размер пачки чтения статей.
+        queryset (QuerySet, optional): Статьи; по умолчанию все.
+
+    Returns:
+        tuple: Массив id статей и список пар (номера столбцов, веса) по статьям.
+    """
+    ids = []
+    vectors = []
+    for pk, counts in _iter_documents(batch_size, queryset):
+        ids.append(pk)
+        vectors.append(vectorize(counts, vocabulary, idf))
+    return np.array(ids, dtype=np.int64), vectors
+
+
+def save_index(path, vocabulary, idf, ids, vectors):
+    """
+    Сохраняет словарь, IDF и векторы статей в файл .npz.
+
+    Файл сначала записывается во временный и затем переименовывается,
+    поэтому прерванная запись не портит прежний файл.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    lengths = [len(columns) for columns, _ in vectors]
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        np.savez(
+            file,
+            tokens=np.array(sorted(vocabulary, key=vocabulary.get), dtype=str),
+            idf=idf,
+            ids=ids,
+            offsets=np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]),
+            columns=np.concatenate(
+                [np.empty(0, dtype=np.int32)] + [c for c, _ in vectors]
+            ),
+            weights=np.concatenate(
+                [np.empty(0, dtype=np.float32)] + [w for _, w in vectors]
+            ),
+        )
+    os.replace(temporary, path)
+
+
+def load_index(path):
+    """
+    Загружает словарь, IDF и векторы статей, сохраненные save_index.
+
+    Returns:
+        tuple | None: Словарь, IDF, массив id и список векторов или None,
+            если файла нет или он поврежден.
+    """
+    try:
+        with np.load(path) as data:
+            tokens, idf, ids = data["tokens"], data["idf"], data["ids"]
+            offsets, columns, weights = (
+                data["offsets"],
+                data["columns"],
+                data["weights"],
+            )
+    except (OSError, ValueError, KeyError):
+        return None
+    vocabulary = {token: column for column, token in enumerate(tokens.tolist())}
+    vectors = [
+        (columns[start:end], weights[start:end])
+        for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+    ]
+    return vocabulary, idf, ids, vectors
+
+
+def update_vectors(index, stale, batch_size=RELATED_BATCH_SIZE):
+    """
+    Обновляет сохраненные векторы: пересчитывает векторы статей stale по
+    прежнему словарю, удаляет векторы удаленных статей.
+
+    Статьи, которых нет в сохраненных векторах, добавляются в stale.
+
+    Args:
+        index (tuple): Словарь, IDF, массив id и список векторов (см. load_index).
+        stale (set): id измененных статей.
+        batch_size (int): Размер пачки чтения статей.
+
+    Returns:
+        tuple: Массив id всех статей и список их векторов.
+    """
+    vocabulary, idf, stored_ids, stored_vectors = index
+    vectors = dict(zip(stored_ids.tolist(), stored_vectors))
+    ids = np.fromiter(
+        Blog.objects.order_by("pk")
+        .values_list("pk", flat=True)
+        .iterator(chunk_size=10000),
+        dtype=np.int64,
+    )
+    stale.update(pk for pk in ids.tolist() if pk not in vectors)
+    stale_ids = sorted(stale)
+    for start in range(0, len(stale_ids), batch_size):
+        batch = Blog.objects.filter(pk__in=stale_ids[start : start + batch_size])
+        for pk, counts in _iter_documents(batch_size, batch):
+            vectors[pk] = vectorize(counts, vocabulary, idf)
+    return ids, [vectors[pk] for pk in ids.tolist()]
+
+
+def _to_dense(vectors, columns):
+    """
+    Собирает плотную матрицу из разреженных векторов только по столбцам columns.
+
+    Сходство с пачкой статей зависит только от слов этих статей, поэтому
+    остальные столбцы словаря в матрицу не попадают.
+    """
+    matrix = np.zeros((len(vectors), len(columns)), dtype=np.float32)
+    for row, (vector_columns, weights) in enumerate(vectors):
+        positions = np.searchsorted(columns, vector_columns)
+        found = positions < len(columns)
+        found[found] = columns[positions[found]] == vector_columns[found]
+        matrix[row, positions[found]] = weights[found]
+    return matrix
+
+
+def merge_top_k(best_ids, best_scores, candidate_ids, candidate_scores, top_k):
+    """
+    Объединяет текущие лучшие результаты с новыми кандидатами построчно.
+
+    Args:
+        best_ids (ndarray): Текущие id похожих статей, форма (n, top_k).
+        best_scores (ndarray): Их сходство, форма (n, top_k).
+        candidate_ids (ndarray): id кандидатов, форма (m,) или (n, m).
+        candidate_scores (ndarray): Сходство кандидатов, форма (n, m);
+            -inf означает, что кандидат не подходит.
+        top_k (int): Сколько лучших результатов оставить.
+
+    Returns:
+        tuple: Новые best_ids и best_scores, по убыванию сходства. Пустые
+            места имеют id -1 и сходство -inf.
+    """
+    if candidate_ids.ndim == 1:
+        candidate_ids = np.broadcast_to(candidate_ids, candidate_scores.shape)
+    ids = np.hstack([best_ids, candidate_ids])
+    scores = np.hstack([best_scores, candidate_scores])
+    top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    ids, scores = np.take_along_axis(ids, top, axis=1), np.take_along_axis(
+        scores, top, axis=1
+    )
+    ids[np.isneginf(scores)] = -1
+    return ids, scores
+
+
+def get_stale_blog_ids():
+    """
+    Возвращает id статей, созданных или измененных после прошлого пересчета.
+    """
+    return set(
+        Blog.objects.filter(
+            Q(related_updated_at__isnull=True)
+            | Q(updated_at__gt=F("related_updated_at"))
+        ).values_list("pk", flat=True)
+    )
+
+
+def _load_stored(ids, top_k):
+    best_ids = np.full((len(ids), top_k), -1, dtype=np.int64)
+    best_scores = np.full((len(ids), top_k), -np.inf, dtype=np.float32)
+    rows = {pk: row for row, pk in enumerate(ids.tolist())}
+    stored = RelatedBlog.objects.filter(position__lt=top_k).values_list(
+        "blog_id", "position", "related_id", "score"
+    )
+    for blog_id, position, related_id, score in stored.iterator():
+        row = rows.get(blog_id)
+        if row is not None:
+            best_ids[row, position] = related_id
+            best_scores[row, position] = score
+    return best_ids, best_scores
+
+
+def compute_related_posts(
+    top_k=RELATED_TOP_K, batch_size=RELATED_BATCH_SIZE, full=False, index_path=None
+):
+    """
+    Пересчитывает похожие статьи для статей, измененных после прошлого запуска.
+
+    Для каждой пачки пересчитываемых статей сходство со всеми статьями
+    считается матричным умножением по пачкам. Измененные статьи и статьи,
+    потерявшие место в списке, получают новый список похожих целиком,
+    остальные - только если измененная статья ближе уже найденных.
+
+    Векторы берутся из файла index_path; заново разбираются только измененные
+    статьи. Если файла нет или передан full, словарь и все векторы строятся
+    заново и все статьи пересчитываются.
+
+    Args:
+        top_k (int): Сколько похожих статей хранить.
+        batch_size (int): Размер пачки статей.
+        full (bool): Пересчитать все статьи и обновить словарь.
+        index_path (str): Файл со словарем и векторами; по умолчанию RELATED_INDEX_PATH.
+
+    Returns:
+        int: Количество статей, у которых изменился список похожих.
+    """
+    started_at = timezone.now()
+    index_path = index_path or settings.RELATED_INDEX_PATH
+    stale = None if full else get_stale_blog_ids()
+    if stale is not None and not stale:
+        return 0
+
+    index = None if full else load_index(index_path)
+    if index is None:
+        vocabulary, idf = build_vocabulary(batch_size)
+        ids, vectors = build_vectors(vocabulary, idf, batch_size)
+        is_stale = np.ones(len(ids), dtype=bool)
+    else:
+        vocabulary, idf = index[:2]
+        ids, vectors = update_vectors(index, stale, batch_size)
+        is_stale = np.isin(ids, list(stale))
+    if not len(ids):
+        return 0
+
+    best_ids, best_scores = _load_stored(ids, top_k)
+    stored_ids = best_ids.copy()
+    # Списки, в которых была измененная статья, пересчитываются целиком:
+    # освободившееся место может занять любая статья
+    is_query = is_stale | np.isin(best_ids, ids[is_stale]).any(axis=1)
+    best_scores[is_query] = -np.inf
+    best_ids[is_query] = -1
+
+    recompute_rows = np.flatnonzero(is_query)
+    for start in range(0, len(recompute_rows), batch_size):
+        query_rows = recompute_rows[start : start + batch_size]
+        query_vectors = [vectors[row] for row in query_rows]
+        columns = np.unique(
+            np.concatenate(
+                [np.empty(0, dtype=np.int32)]
+                + [vector_columns for vector_columns, _ in query_vectors]
+            )
+        )
+        queries = _to_dense(query_vectors, columns)
+        query_stale = is_stale[query_rows]
+        for chunk_start in range(0, len(ids), batch_size):
+            chunk_rows = np.arange(chunk_start, min(chunk_start + batch_size, len(ids)))
+            chunk = _to_dense([vectors[row] for row in chunk_rows], columns)
+            scores = queries @ chunk.T
+            # Статья не похожа сама на себя, статьи без общих слов не похожи
+            scores[query_rows[:, None] == chunk_rows[None, :]] = -np.inf
+            scores[scores <= 0] = -np.inf
+
+            # Похожие статьи для пересчитываемых статей
+            best_ids[query_rows], best_scores[query_rows] = merge_top_k(
+                best_ids[query_rows],
+                best_scores[query_rows],
+                ids[chunk_rows],
+                scores,
+                top_k,
+            )
+            # Измененные статьи в списках остальных статей пачки
+            rest = ~is_query[chunk_rows]
+            if rest.any() and query_stale.any():
+                best_ids[chunk_rows[rest]], best_scores[chunk_rows[rest]] = merge_top_k(
+                    best_ids[chunk_rows[rest]],
+                    best_scores[chunk_rows[rest]],
+                    ids[query_rows[query_stale]],
+                    scores[query_stale][:, rest].T,
+                    top_k,
+                )
+
+    changed = is_stale | (best_ids != stored_ids).any(axis=1)
+    changed_ids = ids[changed]
+    related = [
+        RelatedBlog(
+            blog_id=int(ids[row]),
+            related_id=int(related_id),
+            position=position,
+            score=float(score),
+        )
+        for row in np.flatnonzero(changed)
+        for position, (related_id, score) in enumerate(
+            (related_id, score)
+            for related_id, score in zip(best_ids[row], best_scores[row])
+            if related_id >= 0
+        )
+    ]
+    with transaction.atomic():
+        for start in range(0, len(changed_ids), batch_size):
+            batch = changed_ids[start : start + batch_size].tolist()
+            RelatedBlog.objects.filter(blog_id__in=batch).delete()
+            Blog.objects.filter(pk__in=batch).update(related_updated_at=started_at)
+        RelatedBlog.objects.bulk_create(related, batch_size=batch_size)
+    save_index(index_path, vocabulary, idf, ids, vectors)
+
+    invalidate_page_cache(*(f"detail:{pk}" for pk in changed_ids.tolist()))
+    return len(changed_ids)
@@ -0,0 +1,102 @@
+"""
+Полнотекстовый поиск по статьям.
+
+В PostgreSQL статьи ищутся по сохраненному полю Blog.search_vector с
+GIN-индексом и ранжируются функцией ts_rank. Поле пересчитывается при
+каждом сохранении статьи (см. blog.signals) и командой update_search_vectors.
+Ранжируются все совпадения: сортировка по rank с LIMIT выполняется одним
+запросом, и база держит в памяти только лучшие результаты (top-N heapsort).
+В остальных базах (SQLite для локальной разработки и тестов) используется
+запасной поиск по вхождению подстроки в заголовок и содержимое.
+"""
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, router
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+from blog.models import Blog
+from blog.pagination import BLOG_ORDERING
+
+# Сколько лучших результатов показывается на странице поиска
+SEARCH_RESULTS_LIMIT = 50
+
+
+def get_search_vector():
+    """
+    Возвращает выражение поискового вектора статьи: заголовок важнее содержимого.
+    """
+    config = settings.BLOG_SEARCH_CONFIG
+    return SearchVector("title", weight="A", config=config) + SearchVector(
+        "content", weight="B", config=config
+    )
+
+
+def is_full_text_supported(alias):
+    """
+    Возвращает True, если база поддерживает полнотекстовый поиск PostgreSQL.
+    """
+    return connections[alias].vendor == "postgresql"
+
+
+def update_search_vectors(queryset):
+    """
+    Пересчитывает поисковый вектор статей одним запросом UPDATE.
+
+    Args:
+        queryset (QuerySet): Статьи, у которых изменились заголовок или содержимое.
+
+    Returns:
+        int: Количество обновленных статей.
+    """
+    if not is_full_text_supported(router.db_for_write(Blog)):
+        return 0
+    return queryset.update(search_vector=get_search_vector())
+
+
+def filter_by_search(queryset, query):
+    """
+    Отбирает статьи, подходящие под поисковый запрос, и добавляет к ним rank.
+
+    Args:
+        queryset (QuerySet): Статьи, среди которых выполняется поиск.
+        query (str): Поисковый запрос в синтаксисе websearch ("слово -исключить").
+
+    Returns:
+        QuerySet: Найденные статьи с релевантностью rank, без сортировки.
+    """
+    if is_full_text_supported(queryset.db):
+        search_query = SearchQuery(
+            query, config=settings.BLOG_SEARCH_CONFIG, search_type="websearch"
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F("search_vector"), search_query)
+        )
+
+    in_title = Q(title__icontains=query)
+    return queryset.filter(in_title | Q(content__icontains=query)).annotate(
+        rank=Case(
+            When(in_title, then=Value(1.0)),
+            default=Value(0.5),
+            output_field=FloatField(),
+        )
+    )
+
+
+def search_blogs(queryset, query, limit=SEARCH_RESULTS_LIMIT):
+    """
+    Возвращает самые релевантные статьи по поисковому запросу.
+
+    Релевантность считается для всех совпадений, а сортировка и LIMIT
+    выполняются в том же запросе, поэтому лучшая статья не теряется,
+    даже если она найдена последней.
+
+    Args:
+        queryset (QuerySet): Статьи, среди которых выполняется поиск.
+        query (str): Поисковый запрос.
+        limit (int): Количество результатов.
+
+    Returns:
+        QuerySet: Статьи по убыванию релевантности, затем по дате.
+    """
+    return filter_by_search(queryset, query).order_by("-rank", *BLOG_ORDERING)[:limit]
@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from blog.models import Blog
+
+
+class BlogListSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор статьи для ленты API.
+
+    Содержимое статьи в ленту не входит.
+    """
+
+    owner = serializers.StringRelatedField()
+
+    class Meta:
+        model = Blog
+        fields = (
+            "id",
+            "title",
+            "preview",
+            "owner",
+            "is_premium",
+            "count_view",
+            "created_at",
+        )
@@ -0,0 +1,181 @@
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import Blog, BlogViewStat
+
+logger = logging.getLogger(__name__)
+
+_pending_views = Counter()
+_pending_lock = threading.Lock()
+_flush_thread = None
+
+
+def record_view(blog_id):
+    """
+    Учитывает просмотр статьи без записи в базу данных.
+
+    Просмотры накапливаются в памяти процесса и сбрасываются в базу
+    функцией flush_view_counts из фонового потока.
+
+    Args:
+        blog_id (int): Идентификатор статьи.
+    """
+    with _pending_lock:
+        _pending_views[blog_id] += 1
+    _start_flush_thread()
+
+
+def get_pending_views(blog_id):
+    """
+    Возвращает количество просмотров статьи, еще не сохраненных в базу.
+
+    Args:
+        blog_id (int): Идентификатор статьи.
+
+    Returns:
+        int: Количество накопленных просмотров.
+    """
+    with _pending_lock:
+        return _pending_views[blog_id]
+
+
+def flush_view_counts():
+    """
+    Сохраняет накопленные просмотры в базу.
+
+    Для каждой статьи выполняется атомарный UPDATE вида
+    count_view = count_view + N, и просмотры добавляются в почасовую
+    статистику текущего часа. Если запись не удалась, несохраненные
+    просмотры возвращаются в буфер.
+
+    Returns:
+        int: Количество обновленных статей.
+    """
+    with _pending_lock:
+        pending = dict(_pending_views)
+        _pending_views.clear()
+
+    hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+    flushed = 0
+    try:
+        for blog_id, views in pending.items():
+            with transaction.atomic():
+                if Blog.objects.filter(pk=blog_id).update(
+                    count_view=F("count_view") + views
+                ):
+                    add_hourly_views(blog_id, hour, views)
+            flushed += 1
+    except Exception:
+        with _pending_lock:
+            _pending_views.update(dict(list(pending.items())[flushed:]))
+        raise
+    return flushed
+
+
+def add_hourly_views(blog_id, hour, views):
+    """
+    Добавляет просмотры статьи в почасовую статистику.
+
+    Args:
+        blog_id (int): Идентификатор статьи.
+        hour (datetime): Начало часа.
+        views (int): Количество просмотров.
+    """
+    stats = BlogViewStat.objects.filter(blog_id=blog_id, hour=hour)
+    if stats.update(views=F("views") + views):
+        return
+    try:
+        with transaction.atomic():
+            BlogViewStat.objects.create(blog_id=blog_id, hour=hour, views=views)
+    except IntegrityError:
+        # Строку за этот час успел создать другой процесс
+        stats.update(views=F("views") + views)
+
+
+def _flush_loop(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush_view_counts()
+        except Exception:
+            logger.exception("Не удалось сохранить просмотры статей")
+        finally:
+            close_old_connections()
+
+
+def _start_flush_thread():
+    global _flush_thread
+    interval = settings.VIEW_COUNT_FLUSH_INTERVAL
+    if not interval or _flush_thread is not None:
+        return
+    with _pending_lock:
+        if _flush_thread is None:
+            _flush_thread = threading.Thread(
+                target=_flush_loop,
+                args=(interval,),
+                name="view-count-flush",
+                daemon=True,
+            )
+            _flush_thread.start()
+
+
+atexit.register(flush_view_counts)
+
+
+def get_page_version(scope):
+    """
+    Возвращает версию области кэша страниц блога.
+
+    Версия - это время последнего изменения области (timestamp). Если версия
+    отсутствует в кэше, она создается с текущим временем, поэтому после
+    вытеснения из кэша версия только растет: клиенты получают новую
+    страницу, а не ошибочный ответ 304. Кэш общий для всех процессов
+    (CACHE_BACKEND), поэтому версия одинакова во всех рабочих процессах.
+
+    Args:
+        scope (str): Область кэша, например "list" или "detail:15".
+
+    Returns:
+        float: Время последнего изменения области.
+    """
+    return cache.get_or_set(f"blog:page_version:{scope}", time.time, None)
+
+
+def get_page_cache_key(scope, path):
+    """
+    Возвращает версионированный ключ кэша страницы блога.
+
+    Версия хранится в кэше отдельно для каждой области (лента или конкретная
+    статья), поэтому сброс версии делает недоступными все закэшированные
+    страницы этой области, не затрагивая остальные.
+
+    Args:
+        scope (str): Область кэша, например "list" или "detail:15".
+        path (str): Путь запроса вместе с параметрами.
+
+    Returns:
+        str: Ключ кэша страницы.
+    """
+    path_hash = hashlib.md5(path.encode()).hexdigest()
+    return f"blog:page:{scope}:{get_page_version(scope)}:{path_hash}"
+
+
+def invalidate_page_cache(*scopes):
+    """
+    Сбрасывает кэш страниц блога для указанных областей.
+
+    Args:
+        *scopes (str): Области кэша, например "list" или "detail:15".
+    """
+    version = time.time()
+    cache.set_many({f"blog:page_version:{scope}": version for scope in scopes}, None)
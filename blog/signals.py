@@ -1,12 +1,54 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
-from blog.models import Blog
+from blog.images import refresh_renditions
+from blog.models import Blog, RelatedBlog
+from blog.search import update_search_vectors
+from blog.services import invalidate_page_cache
 
 
-@receiver(pre_save, sender=Blog)
-def set_paid_status(sender, instance, **kwargs):
-    if instance.owner.subscription.is_subscribed:
-        instance.is_paid = True
-    else:
-        instance.is_paid = False
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+def invalidate_blog_pages(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш ленты, страницы измененной или удаленной статьи и страниц
+    статей, на которых она выводится среди похожих.
+    """
+    neighbour_of = RelatedBlog.objects.filter(related=instance).values_list(
+        "blog_id", flat=True
+    )
+    invalidate_page_cache(
+        "list", *(f"detail:{pk}" for pk in [instance.pk, *neighbour_of])
+    )
+
+
+@receiver(pre_delete, sender=Blog)
+def mark_neighbours_stale(sender, instance, **kwargs):
+    """
+    Помечает статьи, у которых удаляемая статья выводится среди похожих, для
+    пересчета похожих статей и сбрасывает кэш их страниц: места в списке
+    освобождаются вместе с ней. После удаления связи уже не найти.
+    """
+    neighbour_of = list(
+        Blog.objects.filter(neighbours__related=instance).values_list("pk", flat=True)
+    )
+    Blog.objects.filter(pk__in=neighbour_of).update(related_updated_at=None)
+    invalidate_page_cache(*(f"detail:{pk}" for pk in neighbour_of))
+
+
+@receiver(post_save, sender=Blog)
+def update_blog_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Пересчитывает поисковый вектор статьи при изменении заголовка или содержимого.
+    """
+    if update_fields is None or {"title", "content"} & set(update_fields):
+        update_search_vectors(Blog.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Blog)
+def create_preview_renditions(sender, instance, **kwargs):
+    """
+    Создает уменьшенные копии и WebP-версии изображения статьи.
+    """
+    if instance.preview:
+        refresh_renditions(instance.preview)
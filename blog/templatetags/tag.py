@@ -1,4 +1,8 @@
 from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from blog.images import get_renditions
 
 register = template.Library()
 
@@ -8,3 +12,51 @@ def mymedia(value):
     if value:
         return f"/media/{value}"
     return "Снимок экрана 2024-07-12 в 22.25.01.png"
+
+
+@register.filter(name="entitlement")
+def entitlement(blog, user):
+    """
+    Возвращает класс доступа пользователя к статье для ключей кэша фрагментов.
+
+    Классы: superuser, owner, subscriber и anonymous (в том числе
+    авторизованный пользователь без подписки). Фильтр не обращается к базе.
+    """
+    if user.is_superuser:
+        return "superuser"
+    if user.is_authenticated and blog.owner_id == user.pk:
+        return "owner"
+    if user.is_authenticated and user.has_premium:
+        return "subscriber"
+    return "anonymous"
+
+
+@register.simple_tag
+def responsive_image(image, sizes="100vw", **attrs):
+    """
+    Выводит изображение с уменьшенными копиями в srcset и ленивой загрузкой.
+
+    Браузеры с поддержкой WebP получают WebP-копии, остальные - копии в
+    исходном формате. Пример:
+    {% responsive_image object.preview alt=object.title class="card-img-top" %}
+    """
+    attrs.setdefault("loading", "lazy")
+    attrs.setdefault("decoding", "async")
+    renditions = get_renditions(image) if image else []
+    if not renditions:
+        return format_html('<img src="{}"{}>', mymedia(image), flatatt(attrs))
+
+    srcset = ", ".join(f"{mymedia(name)} {width}w" for width, name, _ in renditions)
+    webp_srcset = ", ".join(
+        f"{mymedia(webp)} {width}w" for width, _, webp in renditions
+    )
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        webp_srcset,
+        sizes,
+        mymedia(image),
+        srcset,
+        sizes,
+        flatatt(attrs),
+    )
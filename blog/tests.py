@@ -1,8 +1,41 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
 
-from blog.models import Blog
-from users.models import User
+from blog.benchmark import _measure, compare_results, run_benchmark, seed_data
+from blog.forms import BlogFormPremium
+from blog.images import get_renditions
+from blog.importers import import_blogs
+from blog.models import Blog, BlogViewStat, RelatedBlog
+from blog.pagination import BLOG_PAGE_SIZE
+from blog.related import compute_related_posts
+from blog.search import search_blogs
+from blog.services import flush_view_counts, get_pending_views, record_view
+from blog.templatetags.tag import responsive_image
+from blog.trending import (
+    TRENDING_CACHE_KEY,
+    TRENDING_LOCK_KEY,
+    get_trending,
+    prune_view_stats,
+    refresh_trending,
+)
+from users.models import Subscription, User
 
 
 class BlogTestCase(TestCase):
@@ -40,3 +73,607 @@ class BlogTestCase(TestCase):
     def test_get_delete_blog(self):
         self.blog.delete()
         self.assertEqual(Blog.objects.count(), 0)
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0, PAGE_CACHE_TIMEOUT=0)
+class BlogViewCountTestCase(TestCase):
+    def setUp(self):
+        flush_view_counts()
+        self.blog = Blog.objects.create(title="blog 2", content="testing", count_view=5)
+
+    def test_detail_view_does_not_write_count(self):
+        url = reverse("blog:blog_detail", args=[self.blog.pk])
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertEqual(response.context["blog"].count_view, 7)
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.count_view, 5)
+
+        self.assertEqual(flush_view_counts(), 1)
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.count_view, 7)
+        self.assertEqual(get_pending_views(self.blog.pk), 0)
+
+
+class BlogPaginationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        Blog.objects.bulk_create(
+            Blog(title=f"blog {i}", content="testing") for i in range(BLOG_PAGE_SIZE + 3)
+        )
+
+    def test_list_pages_do_not_overlap(self):
+        url = reverse("blog:blog_list")
+        response = self.client.get(url)
+        first_page = list(response.context["object_list"])
+        self.assertEqual(len(first_page), BLOG_PAGE_SIZE)
+
+        response = self.client.get(url, {"cursor": response.context["next_cursor"]})
+        second_page = list(response.context["object_list"])
+        self.assertEqual(len(second_page), 3)
+        self.assertIsNone(response.context["next_cursor"])
+        self.assertFalse(set(first_page) & set(second_page))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("blog:blog_list"), {"cursor": "broken"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_api_list(self):
+        response = self.client.get(reverse("blog:blog_api_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), BLOG_PAGE_SIZE)
+
+        response = self.client.get(response.json()["next"])
+        self.assertEqual(len(response.json()["results"]), 3)
+        self.assertIsNone(response.json()["next"])
+
+
+class BlogListQueriesTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        owners = [
+            User.objects.create(phone_number=f"+7900000000{i}") for i in range(5)
+        ]
+        self.blogs = Blog.objects.bulk_create(
+            Blog(title=f"blog {i}", content="testing", owner=owners[i % 5], is_premium=i % 2 == 0)
+            for i in range(10)
+        )
+        self.reader = owners[0]
+
+    def test_anonymous_list_queries(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("blog:blog_list"))
+        self.assertEqual(len(response.context["object_list"]), 5)
+
+    def test_authenticated_list_queries(self):
+        self.client.force_login(self.reader)
+        # Сессия, пользователь и одна выборка статей вместе с владельцами
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("blog:blog_list"))
+
+        objects = response.context["object_list"]
+        self.assertEqual(len(objects), 10)
+        for blog in objects:
+            self.assertEqual(blog.can_view, not blog.is_premium or blog.owner == self.reader)
+            self.assertEqual(blog.can_edit, blog.owner == self.reader)
+            self.assertIn("content", blog.get_deferred_fields())
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class BlogPageCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        flush_view_counts()
+        self.blog = Blog.objects.create(title="cached", content="testing")
+        self.other = Blog.objects.create(title="other", content="testing")
+
+    def test_anonymous_pages_are_cached(self):
+        list_url = reverse("blog:blog_list")
+        detail_url = reverse("blog:blog_detail", args=[self.blog.pk])
+        self.client.get(list_url)
+        self.client.get(detail_url)
+
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(list_url), "cached")
+            self.assertContains(self.client.get(detail_url), "cached")
+        self.assertEqual(get_pending_views(self.blog.pk), 2)
+
+    def test_blog_change_purges_affected_pages(self):
+        list_url = reverse("blog:blog_list")
+        detail_url = reverse("blog:blog_detail", args=[self.blog.pk])
+        other_url = reverse("blog:blog_detail", args=[self.other.pk])
+        for url in (list_url, detail_url, other_url):
+            self.client.get(url)
+
+        self.blog.title = "renamed"
+        self.blog.save()
+
+        self.assertContains(self.client.get(list_url), "renamed")
+        self.assertContains(self.client.get(detail_url), "renamed")
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class BlogFragmentCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create(phone_number="+79000000001")
+        self.reader = User.objects.create(phone_number="+79000000002")
+        self.blog = Blog.objects.create(title="fragment", content="testing", owner=self.owner)
+        self.edit_url = reverse("blog:blog_update", args=[self.blog.pk])
+
+    def test_card_is_cached_until_blog_changes(self):
+        list_url = reverse("blog:blog_list")
+        self.client.get(list_url)
+
+        Blog.objects.filter(pk=self.blog.pk).update(title="stale")
+        self.assertContains(self.client.get(list_url), "fragment")
+
+        self.blog.title = "fresh"
+        self.blog.save()
+        self.assertContains(self.client.get(list_url), "fresh")
+
+    def test_card_is_cached_per_entitlement(self):
+        list_url = reverse("blog:blog_list")
+        self.client.force_login(self.owner)
+        self.assertContains(self.client.get(list_url), self.edit_url)
+
+        self.client.force_login(self.reader)
+        self.assertNotContains(self.client.get(list_url), self.edit_url)
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class BlogConditionalGetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        flush_view_counts()
+        self.blog = Blog.objects.create(title="conditional", content="testing")
+
+    def test_detail_not_modified(self):
+        url = reverse("blog:blog_detail", args=[self.blog.pk])
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(get_pending_views(self.blog.pk), 2)
+
+        self.blog.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_login_gets_fresh_page(self):
+        user = User.objects.create(phone_number="+79000000008")
+        url = reverse("blog:blog_detail", args=[self.blog.pk])
+        self.client.force_login(user)
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.logout()
+        self.client.force_login(user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_not_modified(self):
+        url = reverse("blog:blog_list")
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        self.blog.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+
+    def test_evicted_list_version_is_not_reused(self):
+        url = reverse("blog:blog_list")
+        etag = self.client.get(url)["ETag"]
+
+        cache.clear()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_import_changes_list_version(self):
+        url = reverse("blog:blog_list")
+        etag = self.client.get(url)["ETag"]
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "blogs.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"title": "imported", "content": "testing"}) + "\n")
+
+        import_blogs(path)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "imported")
+
+    def test_detail_changes_with_related_posts(self):
+        other = Blog.objects.create(title="conditional other", content="testing")
+        url = reverse("blog:blog_detail", args=[self.blog.pk])
+        etag = self.client.get(url)["ETag"]
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        compute_related_posts(top_k=1, index_path=os.path.join(directory, "index.npz"))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["related_blogs"]), [other])
+
+        other.title = "conditional renamed"
+        other.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertContains(response, "conditional renamed")
+
+
+class BlogPreviewRenditionsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        buffer = BytesIO()
+        Image.new("RGB", (1000, 500), "red").save(buffer, "PNG")
+        self.blog = Blog.objects.create(
+            title="image", content="testing",
+            preview=SimpleUploadedFile("photo.png", buffer.getvalue(), content_type="image/png"),
+        )
+
+    def test_renditions_are_created_on_upload(self):
+        renditions = get_renditions(self.blog.preview)
+
+        self.assertEqual([width for width, _, _ in renditions], [320, 640])
+        storage = self.blog.preview.storage
+        for width, name, webp_name in renditions:
+            self.assertTrue(name.endswith(f"-{width}w.jpg"))
+            with storage.open(webp_name) as file, Image.open(file) as image:
+                self.assertEqual(image.format, "WEBP")
+                self.assertEqual(image.width, width)
+
+    def test_renditions_are_not_regenerated(self):
+        storage = self.blog.preview.storage
+        _, name, _ = get_renditions(self.blog.preview)[0]
+        modified = storage.get_modified_time(name)
+
+        self.blog.title = "renamed"
+        self.blog.save()
+
+        self.assertEqual(storage.get_modified_time(name), modified)
+
+    def test_responsive_image_tag(self):
+        html = responsive_image(self.blog.preview, alt="image")
+
+        self.assertIn('type="image/webp"', html)
+        self.assertIn("-640w.webp 640w", html)
+        self.assertIn('loading="lazy"', html)
+
+
+class BlogEntitlementTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.subscription = Subscription.objects.create()
+        self.user = User.objects.create(phone_number="+79000000005", payments=self.subscription)
+        self.client.force_login(self.user)
+
+    def test_paid_subscription_grants_premium(self):
+        self.subscription.is_subscribed = True
+        self.subscription.save()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.has_premium)
+
+        response = self.client.get(reverse("blog:blog_create"))
+        self.assertIsInstance(response.context["form"], BlogFormPremium)
+
+    def test_deleted_subscription_revokes_premium(self):
+        User.objects.filter(pk=self.user.pk).update(premium_until=timezone.now() + timedelta(days=1))
+        self.subscription.delete()
+        self.user.refresh_from_db()
+
+        self.assertFalse(self.user.has_premium)
+
+    def test_expired_premium_has_no_access(self):
+        User.objects.filter(pk=self.user.pk).update(premium_until=timezone.now() - timedelta(days=1))
+
+        response = self.client.get(reverse("blog:blog_create"))
+        self.assertNotIsInstance(response.context["form"], BlogFormPremium)
+
+    def test_access_checks_do_not_query_subscriptions(self):
+        User.objects.filter(pk=self.user.pk).update(premium_until=timezone.now() + timedelta(days=1))
+        Blog.objects.create(title="premium", content="text", is_premium=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("blog:blog_list"))
+
+        self.assertTrue(response.context["object_list"][0].can_view)
+        self.assertFalse(any("users_subscription" in query["sql"] for query in queries))
+
+
+class BlogSearchTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.in_content = Blog.objects.create(title="Notes", content="Django ORM tips")
+        self.in_title = Blog.objects.create(title="Django", content="Web framework")
+        self.premium = Blog.objects.create(title="Django for subscribers", content="text",
+                                           is_premium=True)
+        Blog.objects.create(title="Flask", content="Microframework")
+
+    def test_search_ranks_title_matches_first(self):
+        response = self.client.get(reverse("blog:blog_list"), {"q": "django"})
+
+        self.assertEqual(list(response.context["object_list"]), [self.in_title, self.in_content])
+        self.assertIsNone(response.context["next_cursor"])
+
+    def test_search_ranks_all_matches(self):
+        Blog.objects.bulk_create(
+            Blog(title=f"Note {number}", content="django") for number in range(1000)
+        )
+        best = Blog.objects.create(title="Django ORM", content="queries")
+
+        results = list(search_blogs(Blog.objects.all(), "django", limit=1))
+
+        self.assertEqual(results, [best])
+
+    def test_admin_search(self):
+        admin = User.objects.create(phone_number="+79000000007", is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse("admin:blog_blog_changelist"), {"q": "django"})
+
+        self.assertEqual(
+            set(response.context["cl"].result_list),
+            {self.in_title, self.in_content, self.premium},
+        )
+
+
+class RelatedPostsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        settings_override = override_settings(
+            RELATED_INDEX_PATH=os.path.join(directory, "related_index.npz")
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.django = Blog.objects.create(title="Django ORM", content="Django models and querysets")
+        self.django_views = Blog.objects.create(title="Django views", content="Django views and templates")
+        self.cooking = Blog.objects.create(title="Soup recipe", content="Boil water, add vegetables")
+        self.cooking_more = Blog.objects.create(title="Soup tips", content="Vegetables and water")
+
+    def get_related(self, blog):
+        return list(RelatedBlog.objects.filter(blog=blog).order_by("position")
+                    .values_list("related_id", flat=True))
+
+    def test_related_posts_are_precomputed(self):
+        self.assertEqual(compute_related_posts(top_k=2), 4)
+
+        self.assertEqual(self.get_related(self.django)[0], self.django_views.pk)
+        self.assertEqual(self.get_related(self.cooking)[0], self.cooking_more.pk)
+
+        response = self.client.get(reverse("blog:blog_detail", args=[self.django.pk]))
+        flush_view_counts()
+        self.assertEqual(list(response.context["related_blogs"])[0], self.django_views)
+
+    def test_recompute_is_incremental(self):
+        compute_related_posts(top_k=2)
+        self.assertEqual(compute_related_posts(top_k=2), 0)
+
+        new_post = Blog.objects.create(title="Django forms", content="Django forms in views")
+        changed = compute_related_posts(top_k=2)
+
+        self.assertEqual(self.get_related(new_post)[0], self.django_views.pk)
+        self.assertIn(new_post.pk, self.get_related(self.django_views))
+        self.assertEqual(changed, 3)
+
+    def test_incremental_recompute_reuses_index(self):
+        compute_related_posts(top_k=2)
+        self.django.content = "Django models, querysets and views"
+        self.django.save()
+
+        with patch("blog.related.build_vocabulary") as build_vocabulary:
+            compute_related_posts(top_k=2)
+        build_vocabulary.assert_not_called()
+        self.assertEqual(self.get_related(self.django)[0], self.django_views.pk)
+
+    def test_deleted_neighbour_is_replaced(self):
+        soup = Blog.objects.create(title="Soup ideas", content="Water soup")
+        compute_related_posts(top_k=1)
+        self.assertEqual(self.get_related(self.cooking), [self.cooking_more.pk])
+
+        self.cooking_more.delete()
+        compute_related_posts(top_k=1)
+        self.assertEqual(self.get_related(self.cooking), [soup.pk])
+
+    def test_command_repeats_with_interval(self):
+        out = StringIO()
+        sleep = patch("blog.management.commands.compute_related_posts.time.sleep",
+                      side_effect=[None, KeyboardInterrupt])
+
+        with sleep, self.assertRaises(KeyboardInterrupt):
+            call_command("compute_related_posts", "--interval", "3600", stdout=out)
+
+        self.assertEqual(out.getvalue().splitlines(), [
+            "Обновлены похожие статьи для 4 статей",
+            "Обновлены похожие статьи для 0 статей",
+        ])
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0, TRENDING_SIZE=2)
+class BlogTrendingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        flush_view_counts()
+        self.popular = Blog.objects.create(title="popular", content="text")
+        self.less_popular = Blog.objects.create(title="less popular", content="text")
+        self.old = Blog.objects.create(title="old", content="text")
+
+    def test_views_are_bucketed_by_hour(self):
+        for blog_id in (self.popular.pk, self.popular.pk, self.less_popular.pk):
+            record_view(blog_id)
+        flush_view_counts()
+        record_view(self.popular.pk)
+        flush_view_counts()
+
+        self.assertEqual(BlogViewStat.objects.get(blog=self.popular).views, 3)
+        self.assertEqual(BlogViewStat.objects.get(blog=self.less_popular).views, 1)
+
+    def test_trending_page_is_one_cached_read(self):
+        now = timezone.now()
+        BlogViewStat.objects.create(blog=self.popular, hour=now, views=10)
+        BlogViewStat.objects.create(blog=self.less_popular, hour=now, views=5)
+        BlogViewStat.objects.create(blog=self.old, hour=now - timedelta(days=60), views=100)
+        refresh_trending()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("blog:blog_trending"))
+
+        self.assertEqual([item["id"] for item in response.context["trending"]],
+                         [self.popular.pk, self.less_popular.pk])
+        api_response = self.client.get(reverse("blog:blog_api_trending"))
+        self.assertEqual(api_response.json()[0]["views"], 10)
+
+        self.assertEqual(prune_view_stats(), 1)
+
+    def test_expired_trending_is_recomputed_by_one_process(self):
+        BlogViewStat.objects.create(blog=self.popular, hour=timezone.now(), views=10)
+        refresh_trending()
+        cache.delete(TRENDING_CACHE_KEY)
+        cache.add(TRENDING_LOCK_KEY, True)
+
+        with self.assertNumQueries(0):
+            trending = get_trending()
+        self.assertEqual([item["id"] for item in trending], [self.popular.pk])
+
+        cache.delete(TRENDING_LOCK_KEY)
+        with self.assertNumQueries(2):
+            get_trending()
+        self.assertIsNone(cache.get(TRENDING_LOCK_KEY))
+
+
+class IndexReportTestCase(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command("index_report", stdout=out)
+
+        self.assertNotIn("полный просмотр", out.getvalue())
+
+
+class BlogImportTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        settings_override = override_settings(MEDIA_ROOT=os.path.join(self.directory, "media"))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.owner = User.objects.create(phone_number="+79000000009")
+
+    def write_jsonl(self, records):
+        path = os.path.join(self.directory, "blogs.jsonl.gz")
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            file.writelines(json.dumps(record) + "\n" for record in records)
+        return path
+
+    def test_import_blogs(self):
+        Image.new("RGB", (400, 10), "red").save(os.path.join(self.directory, "photo.png"))
+        path = self.write_jsonl([
+            {"title": "first", "content": "text", "owner": "+79000000009", "count_view": 7,
+             "is_premium": True, "created_at": "2020-05-01", "preview": "photo.png"},
+            {"title": "second", "content": "text"},
+            {"title": "third", "content": "text", "preview": "missing.png"},
+        ])
+
+        result = import_blogs(path, batch_size=2, media_source=self.directory)
+
+        self.assertEqual(result, {"read": 3, "created": 3})
+        first = Blog.objects.get(title="first")
+        self.assertEqual((first.owner, first.count_view, first.is_premium),
+                         (self.owner, 7, True))
+        self.assertEqual(first.created_at, date(2020, 5, 1))
+        self.assertTrue(first.preview.storage.exists(first.preview.name))
+        with patch("blog.images.generate_renditions") as generate_renditions:
+            self.assertEqual([width for width, _, _ in get_renditions(first.preview)], [320])
+        generate_renditions.assert_not_called()
+        self.assertEqual(Blog.objects.get(title="second").created_at, timezone.localdate())
+        self.assertFalse(Blog.objects.get(title="third").preview)
+
+    def test_unknown_owner_reports_line(self):
+        path = self.write_jsonl([{"title": "first"}, {"title": "second", "owner": "+70000000000"}])
+
+        with self.assertRaisesMessage(ValueError, "Строка 2"):
+            import_blogs(path)
+
+
+class BlogExportTestCase(TestCase):
+    def setUp(self):
+        owner = User.objects.create(phone_number="+79000000010")
+        Blog.objects.create(title="first", content="текст", owner=owner, count_view=3,
+                            is_premium=True)
+        Blog.objects.create(title="second", content="text")
+        self.staff = User.objects.create(phone_number="+79000000011", is_staff=True,
+                                         is_superuser=True)
+
+    def test_export_requires_staff(self):
+        response = self.client.get(reverse("blog:blog_export"))
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_csv_gzip(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("blog:blog_export"), {"format": "csv", "gzip": "1"})
+
+        self.assertTrue(response.streaming)
+        self.assertIn('.csv.gz"', response["Content-Disposition"])
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        rows = list(csv.DictReader(content.splitlines()))
+        self.assertEqual([row["title"] for row in rows], ["first", "second"])
+        self.assertEqual((rows[0]["owner"], rows[0]["count_view"], rows[0]["is_premium"]),
+                         ("+79000000010", "3", "True"))
+
+    def test_admin_action_exports_selected(self):
+        self.client.force_login(self.staff)
+        first = Blog.objects.get(title="first")
+        response = self.client.post(
+            reverse("admin:blog_blog_changelist"),
+            {"action": "export_jsonl", "_selected_action": [first.pk]},
+        )
+
+        records = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual((records[0]["content"], records[0]["is_premium"]), ("текст", True))
+
+
+class BenchmarkTestCase(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_queries_are_counted_on_every_database(self):
+        def action():
+            Blog.objects.using("default").exists()
+            Blog.objects.using("replica").exists()
+            return True
+
+        self.assertEqual(_measure(action)[1:], (2, True))
+
+    def test_benchmark_reports_metrics(self):
+        seed_data(posts=30, users=20, paid_ratio=0.5, pending_ratio=0.3, batch_size=7)
+        self.assertEqual(Blog.objects.count(), 30)
+
+        result = run_benchmark(concurrency=1, requests=3, stripe_latency=0, host="testserver")
+
+        self.assertGreater(result["stripe_calls"], 0)
+        for name in ("blog_list", "blog_list_premium", "blog_detail", "blog_create",
+                     "perform_create"):
+            stats = result["results"][name]
+            self.assertEqual((stats["requests"], stats["errors"]), (3, 0))
+            self.assertGreater(stats["rps"], 0)
+            self.assertLessEqual(stats["latency_ms"]["p50"], stats["latency_ms"]["p99"])
+        self.assertGreater(result["results"]["blog_list"]["queries"]["max"], 0)
+        self.assertEqual(result["results"]["checkout_jobs"]["errors"], 0)
+        self.assertEqual(len(compare_results(result, result)), 3 * len(result["results"]))
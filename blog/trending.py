@@ -0,0 +1,117 @@
+"""
+Рейтинг популярных статей по просмотрам за последние дни.
+
+Рейтинг считается по почасовой статистике BlogViewStat и хранится в кэше,
+поэтому страница популярных статей читает одно значение из кэша.
+Пересчет выполняет команда refresh_trending (сервис trending в
+docker-compose); если она не запущена или кэш не общий для процессов,
+рейтинг пересчитывается при первом запросе после истечения
+TRENDING_REFRESH_INTERVAL. Такой пересчет выполняет только процесс,
+захвативший блокировку в кэше, остальные отдают прошлый рейтинг.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from blog.models import Blog, BlogViewStat
+
+TRENDING_CACHE_KEY = "blog:trending"
+
+# Копия последнего рейтинга без срока жизни, ее отдают запросы, пока
+# рейтинг пересчитывает другой процесс
+TRENDING_STALE_CACHE_KEY = "blog:trending:stale"
+
+# Блокировка пересчета при запросе; срок жизни ограничивает ожидание,
+# если процесс с блокировкой упал
+TRENDING_LOCK_KEY = "blog:trending:lock"
+TRENDING_LOCK_TIMEOUT = 60
+
+
+def compute_trending(now=None):
+    """
+    Считает самые просматриваемые статьи за TRENDING_WINDOW_DAYS дней.
+
+    Args:
+        now (datetime, optional): Конец периода, по умолчанию текущее время.
+
+    Returns:
+        list: Словари с id, title, is_premium и views, по убыванию просмотров.
+    """
+    now = now or timezone.now()
+    since = now - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+    top = list(
+        BlogViewStat.objects.filter(hour__gte=since)
+        .values("blog_id")
+        .annotate(total=Sum("views"))
+        .order_by("-total", "blog_id")[: settings.TRENDING_SIZE]
+    )
+    blogs = Blog.objects.only("title", "is_premium").in_bulk(
+        [row["blog_id"] for row in top]
+    )
+    return [
+        {
+            "id": row["blog_id"],
+            "title": blogs[row["blog_id"]].title,
+            "is_premium": blogs[row["blog_id"]].is_premium,
+            "views": row["total"],
+        }
+        for row in top
+        if row["blog_id"] in blogs
+    ]
+
+
+def refresh_trending(timeout=None):
+    """
+    Пересчитывает рейтинг и сохраняет его в кэше.
+
+    Args:
+        timeout (int, optional): Время жизни рейтинга в кэше в секундах,
+            по умолчанию TRENDING_REFRESH_INTERVAL.
+
+    Returns:
+        list: Новый рейтинг.
+    """
+    trending = compute_trending()
+    cache.set(
+        TRENDING_CACHE_KEY, trending, timeout or settings.TRENDING_REFRESH_INTERVAL
+    )
+    cache.set(TRENDING_STALE_CACHE_KEY, trending, None)
+    return trending
+
+
+def get_trending():
+    """
+    Возвращает рейтинг популярных статей из кэша, пересчитывая его, если он устарел.
+
+    Пересчитывает рейтинг только один процесс: пока он держит блокировку,
+    остальные запросы получают прошлый рейтинг (или пустой список).
+
+    Returns:
+        list: Словари с id, title, is_premium и views.
+    """
+    trending = cache.get(TRENDING_CACHE_KEY)
+    if trending is not None:
+        return trending
+    if not cache.add(TRENDING_LOCK_KEY, True, TRENDING_LOCK_TIMEOUT):
+        return cache.get(TRENDING_STALE_CACHE_KEY, [])
+    try:
+        return refresh_trending()
+    finally:
+        cache.delete(TRENDING_LOCK_KEY)
+
+
+def prune_view_stats(now=None):
+    """
+    Удаляет почасовую статистику старше VIEW_STATS_RETENTION_DAYS дней.
+
+    Returns:
+        int: Количество удаленных строк.
+    """
+    now = now or timezone.now()
+    since = now - timedelta(days=settings.VIEW_STATS_RETENTION_DAYS)
+    deleted, _ = BlogViewStat.objects.filter(hour__lt=since).delete()
+    return deleted
@@ -2,8 +2,16 @@ from django.urls import path
 
 from blog import views
 from blog.apps import BlogConfig
-from blog.views import (BlogCreateView, BlogDeleteView, BlogDetailView,
-                        BlogListView, BlogUpdateView)
+from blog.views import (
+    BlogCreateView,
+    BlogDeleteView,
+    BlogDetailView,
+    BlogListAPIView,
+    BlogListView,
+    BlogTrendingAPIView,
+    BlogTrendingView,
+    BlogUpdateView,
+)
 
 app_name = BlogConfig.name
 
@@ -13,7 +21,11 @@ urlpatterns = [
     path("update/<int:pk>/", BlogUpdateView.as_view(), name="blog_update"),
     path("delete/<int:pk>/", BlogDeleteView.as_view(), name="blog_delete"),
     path("create/", BlogCreateView.as_view(), name="blog_create"),
-    path('subscription-required/', views.subscription_required, name='subscription_required')
+    path('subscription-required/', views.subscription_required, name='subscription_required'),
+    path("api/blogs/", BlogListAPIView.as_view(), name="blog_api_list"),
+    path("trending/", BlogTrendingView.as_view(), name="blog_trending"),
+    path("api/trending/", BlogTrendingAPIView.as_view(), name="blog_api_trending"),
+    path("export/", views.blog_export, name="blog_export"),
 ]
 
 """
@@ -27,6 +39,10 @@ URL Patterns:
     'update/<int:pk>/' (str): Обновление конкретной статьи блога по идентификатору.
     'delete/<int:pk>/' (str): Удаление конкретной статьи блога по идентификатору.
     'create/' (str): Создание новой статьи блога.
+    'api/blogs/' (str): Лента статей в формате JSON с keyset-пагинацией.
+    'trending/' (str): Популярные статьи за последние дни.
+    'api/trending/' (str): Популярные статьи в формате JSON.
+    'export/' (str): Выгрузка статей в JSONL или CSV для персонала.
 
 Attributes:
     app_name (str): Имя приложения блога для пространства имен URL.
@@ -1,18 +1,168 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import Http404, HttpResponseBadRequest
 from django.shortcuts import render
 from django.urls import reverse_lazy
-from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
-
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.generic import (
+    CreateView,
+    DeleteView,
+    DetailView,
+    ListView,
+    TemplateView,
+    UpdateView,
+)
+from rest_framework.generics import ListAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from blog.exporters import EXPORT_FORMATS, export_response
 from blog.forms import BlogForm, BlogFormPremium
 from blog.models import Blog
-from users.models import Subscription
-from users.services import check_payment_status
-from django.core.exceptions import ObjectDoesNotExist
+from blog.pagination import BLOG_PAGE_SIZE, BlogCursorPagination, paginate_by_cursor
+from blog.search import search_blogs
+from blog.serializers import BlogListSerializer
+from blog.services import (
+    get_page_cache_key,
+    get_page_version,
+    get_pending_views,
+    record_view,
+)
+from blog.trending import get_trending
+
+
+class AnonymousPageCacheMixin:
+    """
+    Миксин для кэширования страниц, которые видят неавторизованные пользователи.
+
+    Ответ на GET-запрос без авторизации сохраняется в кэше на PAGE_CACHE_TIMEOUT
+    секунд под версионированным ключом области get_page_cache_scope().
+    Авторизованные пользователи всегда получают свежую страницу.
+    Условные запросы к закэшированной странице обрабатываются по ее ETag
+    и Last-Modified без обращения к базе.
+    """
+
+    def get_page_cache_scope(self):
+        raise NotImplementedError
+
+    def page_cache_hit(self):
+        """
+        Вызывается, когда ответ отдан из кэша без вызова представления.
+        """
+
+    def dispatch(self, request, *args, **kwargs):
+        timeout = settings.PAGE_CACHE_TIMEOUT
+        if not timeout or request.method != "GET" or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        cache_key = get_page_cache_key(self.get_page_cache_scope(), request.get_full_path())
+        response = cache.get(cache_key)
+        if response is not None:
+            self.page_cache_hit()
+            return get_conditional_response(
+                request,
+                etag=response.get("ETag"),
+                last_modified=parse_http_date_safe(response.get("Last-Modified", "")),
+                response=response,
+            )
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            if hasattr(response, "render") and not response.is_rendered:
+                response.add_post_render_callback(lambda r: cache.set(cache_key, r, timeout))
+            else:
+                cache.set(cache_key, response, timeout)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Миксин для условных GET-запросов по ETag и Last-Modified.
+
+    Если страница не изменилась с момента, указанного в If-None-Match или
+    If-Modified-Since, возвращается ответ 304 без выполнения представления
+    и рендеринга шаблона.
+    """
+
+    def get_last_modified(self):
+        """
+        Возвращает время последнего изменения страницы (timestamp) или None,
+        если условный ответ невозможен.
+        """
+        raise NotImplementedError
 
+    def get_etag_version(self, last_modified):
+        """
+        Возвращает часть ETag, которая меняется вместе со страницей;
+        по умолчанию это время ее изменения.
+        """
+        return last_modified
 
-class BlogCreateView(CreateView):
+    def get_etag(self, last_modified):
+        """
+        Возвращает слабый ETag страницы. Страница зависит от пользователя,
+        поэтому в ETag входят его идентификатор и подписка. Страница
+        авторизованного пользователя содержит CSRF-токен, который меняется при
+        входе вместе с сессией, поэтому в ETag входит и хэш ключа сессии.
+        """
+        user = self.request.user
+        if user.is_authenticated:
+            session_key = self.request.session.session_key or ""
+            session_hash = hashlib.md5(session_key.encode()).hexdigest()[:12]
+            viewer = f"{user.pk}-{int(user.has_premium)}-{session_hash}"
+        else:
+            viewer = "anonymous"
+        return f'W/"{self.get_etag_version(last_modified)}-{viewer}"'
+
+    def not_modified_hit(self):
+        """
+        Вызывается, когда клиенту отдан ответ 304.
+        """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        etag = quote_etag(self.get_etag(last_modified))
+        last_modified = int(last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            if response.status_code == 304:
+                self.not_modified_hit()
+        else:
+            response = super().dispatch(request, *args, **kwargs)
+        if not response.has_header("Last-Modified"):
+            response.headers["Last-Modified"] = http_date(last_modified)
+        response.headers.setdefault("ETag", etag)
+        return response
+
+
+class SubscriptionStatusMixin:
+    """
+    Миксин для проверки оплаченной подписки текущего пользователя.
+
+    Статус подписки хранится в самом пользователе (User.premium_until),
+    поэтому проверка не обращается ни к базе, ни к Stripe.
+    """
+
+    def has_subscription(self):
+        """
+        Возвращает True, если у пользователя оплаченная подписка.
+        """
+        user = self.request.user
+        return user.is_authenticated and user.has_premium
+
+
+class BlogCreateView(SubscriptionStatusMixin, CreateView):
     model = Blog
     template_name = "blog/blog_form.html"
     success_url = reverse_lazy("blog:blog_list")
@@ -44,20 +194,14 @@ class BlogCreateView(CreateView):
             new_content.owner = self.request.user  # Используйте 'owner' вместо 'user'
             new_content.publish = True
             # Устанавливаем флаг платного контента в зависимости от статуса пользователя
-            new_content.is_premium = self.request.user.payments.exists() is not None or self.request.user.is_superuser
+            new_content.is_premium = self.request.user.has_premium or self.request.user.is_superuser
         new_content.save()
         return super().form_valid(form)
 
     def get_form_class(self):
-        user = self.request.user
-        try:
-            subscription = Subscription.objects.get(pk=user.payments_id)
-            if check_payment_status(subscription.content_id):
-                return BlogFormPremium
-            else:
-                return BlogForm
-        except ObjectDoesNotExist:
-            return BlogForm
+        if self.has_subscription():
+            return BlogFormPremium
+        return BlogForm
 
 
 class BlogUpdateView(UpdateView):
@@ -75,9 +219,48 @@ class BlogUpdateView(UpdateView):
         return self.object
 
 
-class BlogListView(ListView):
+class BlogListView(AnonymousPageCacheMixin, ConditionalGetMixin, ListView):
     model = Blog
     template_name = "blog/blog_list.html"
+    paginate_by = BLOG_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+            Возвращает страницу блог-постов по курсору из параметра cursor.
+
+            Вместо стандартного Paginator используется keyset-пагинация,
+            которая не выполняет COUNT(*) и OFFSET. Результаты поиска
+            выводятся одной страницей.
+
+            Возвращает:
+            - tuple: (paginator, page, object_list, is_paginated), как ожидает ListView.
+        """
+        if self.get_search_query():
+            self.next_cursor = None
+            return None, None, queryset, False
+        try:
+            page, self.next_cursor = paginate_by_cursor(
+                queryset, self.request.GET.get("cursor"), page_size
+            )
+        except ValueError:
+            raise Http404("Неверный курсор")
+        return None, None, page, self.next_cursor is not None
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["next_cursor"] = self.next_cursor
+        context["search_query"] = self.get_search_query()
+        return context
+
+    def get_page_cache_scope(self):
+        return "list"
+
+    def get_last_modified(self):
+        """
+            Лента меняется при сохранении или удалении любой статьи, поэтому
+            временем ее изменения служит версия кэша ленты.
+        """
+        return get_page_version("list")
 
     def get_queryset(self):
         """
@@ -89,35 +272,103 @@ class BlogListView(ListView):
             Если пользователь является суперпользователем или аутентифицирован, возвращается полный queryset
             всех блог-постов.
 
+            Queryset подготовлен для ленты: владелец подгружается через JOIN,
+            содержимое статьи не выбирается, а флаги can_view и can_edit
+            вычисляются в SQL.
+
+            Если задан поисковый запрос (параметр q), возвращаются самые
+            релевантные статьи по нему.
+
             Возвращает:
             - QuerySet: В зависимости от статуса аутентификации и прав пользователя,
               возвращается соответствующий QuerySet блог-постов.
         """
+        queryset = Blog.objects.for_list(self.request.user)
         if not self.request.user.is_authenticated:
-            return Blog.objects.filter(is_premium=False)
-        elif self.request.user.is_superuser or self.request.user.is_authenticated or check_payment_status(
-                self.request.user.payments.content_id):
-            return Blog.objects.all()
+            queryset = queryset.filter(is_premium=False)
+        query = self.get_search_query()
+        if query:
+            return search_blogs(queryset, query)
+        return queryset
 
+    def get_search_query(self):
+        return self.request.GET.get("q", "").strip()
 
-class BlogDetailView(DetailView):
+
+class BlogDetailView(AnonymousPageCacheMixin, ConditionalGetMixin, DetailView):
     model = Blog
 
+    def get_page_cache_scope(self):
+        return f"detail:{self.kwargs['pk']}"
+
+    def page_cache_hit(self):
+        record_view(self.kwargs["pk"])
+
+    def not_modified_hit(self):
+        record_view(self.kwargs["pk"])
+
+    def get_last_modified(self):
+        """
+            Возвращает время изменения страницы, если статья доступна пользователю.
+
+            На странице выводятся и похожие статьи, поэтому страница меняется
+            при изменении статьи, при пересчете ее похожих статей
+            (related_updated_at) и при изменении самих похожих статей.
+        """
+        modified = (
+            self.get_queryset()
+            .filter(pk=self.kwargs["pk"])
+            .annotate(related_modified=Max("neighbours__related__updated_at"))
+            .values_list("updated_at", "related_updated_at", "related_modified")
+            .first()
+        )
+        if modified is None:
+            return None
+        self.modified = [value.timestamp() if value else 0 for value in modified]
+        return max(self.modified)
+
+    def get_etag_version(self, last_modified):
+        return "-".join(str(value) for value in self.modified)
+
     def get_object(self, queryset=None):
         """
-            Возвращает объект блога для текущей страницы и обновляет счетчик просмотров.
+            Возвращает объект блога для текущей страницы и учитывает просмотр.
+
+            Просмотр накапливается в памяти и сохраняется в базу пакетно,
+            поэтому страница статьи не выполняет запись в базу.
 
             Args:
             - queryset (QuerySet, optional): QuerySet для поиска объекта блога.
 
             Returns:
-            - Blog: Обновленный объект блога.
+            - Blog: Объект блога с учетом еще не сохраненных просмотров.
         """
         self.object = super().get_object(queryset)
-        self.object.count_view += 1
-        self.object.save()
+        record_view(self.object.pk)
+        self.object.count_view += get_pending_views(self.object.pk)
         return self.object
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["related_blogs"] = self.get_related_blogs()
+        return context
+
+    def get_related_blogs(self):
+        """
+            Возвращает похожие статьи, подобранные заранее командой compute_related_posts.
+
+            Returns:
+            - QuerySet: Похожие статьи с флагом can_view, от самой похожей.
+        """
+        queryset = (
+            Blog.objects.for_list(self.request.user)
+            .filter(neighbour_of__blog=self.object)
+            .order_by("neighbour_of__position")
+        )
+        if not self.request.user.is_authenticated:
+            queryset = queryset.filter(is_premium=False)
+        return queryset
+
     def get_queryset(self):
         """
             Возвращает queryset блог-постов в зависимости от аутентификации пользователя и его прав.
@@ -134,8 +385,7 @@ class BlogDetailView(DetailView):
         """
         if not self.request.user.is_authenticated:
             return Blog.objects.filter(is_premium=False)
-        elif self.request.user.is_superuser or self.request.user.payments or self.request.user.is_authenticated:
-            return Blog.objects.all()
+        return Blog.objects.all()
 
 
 class BlogDeleteView(LoginRequiredMixin, DeleteView):
@@ -158,13 +408,67 @@ class BlogDeleteView(LoginRequiredMixin, DeleteView):
         """
         if not self.request.user.is_authenticated:
             return Blog.objects.filter(is_premium=False)
-        elif self.request.user.is_superuser or self.request.user.payments or self.request.user.is_authenticated:
-            return Blog.objects.all()
+        return Blog.objects.all()
 
     def test_func(self):
         blog = self.get_object()
         return self.request.user == blog.owner or self.request.user.is_superuser
 
 
+class BlogListAPIView(ListAPIView):
+    """
+    Лента статей в формате JSON с keyset-пагинацией.
+
+    Неавторизованным пользователям доступны только бесплатные статьи.
+    """
+
+    serializer_class = BlogListSerializer
+    pagination_class = BlogCursorPagination
+
+    def get_queryset(self):
+        queryset = Blog.objects.for_list(self.request.user)
+        if not self.request.user.is_authenticated:
+            return queryset.filter(is_premium=False)
+        return queryset
+
+
+class BlogTrendingView(TemplateView):
+    """
+    Страница популярных статей за последние TRENDING_WINDOW_DAYS дней.
+
+    Рейтинг читается из кэша одним обращением (см. blog.trending).
+    """
+
+    template_name = "blog/blog_trending.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["trending"] = get_trending()
+        return context
+
+
+class BlogTrendingAPIView(APIView):
+    """
+    Популярные статьи в формате JSON: id, title, is_premium и views.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_trending())
+
+
 def subscription_required(request):
     return render(request, 'blog/blog_not_available.html')
+
+
+@staff_member_required
+def blog_export(request):
+    """
+    Выгрузка всех статей для персонала с владельцем, просмотрами и признаком платности.
+
+    Параметры запроса: format - jsonl (по умолчанию) или csv, gzip=1 - сжать
+    выгрузку. Файл формируется по мере чтения из базы (см. blog.exporters).
+    """
+    file_format = request.GET.get("format", "jsonl")
+    if file_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest(f"Формат должен быть одним из: {', '.join(EXPORT_FORMATS)}")
+    return export_response(Blog.objects.all(), file_format, request.GET.get("gzip") == "1")
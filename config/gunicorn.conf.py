@@ -0,0 +1,80 @@
+"""
+Настройки gunicorn для запуска приложения в продакшене вместо runserver.
+
+    gunicorn -c config/gunicorn.conf.py
+
+gunicorn запускает главный процесс, который заранее создает рабочие
+процессы (pre-fork) и перезапускает упавшие или зависшие. По умолчанию
+рабочих процессов 2 * CPU + 1, в каждом WEB_THREADS потоков (gthread):
+пока поток ждет базу или Stripe, другие потоки обслуживают запросы.
+С ASYNC_VIEWS=1 приложение запускается как ASGI в рабочих процессах uvicorn,
+по одному на CPU.
+
+Рабочим процессам нужен общий кэш (CACHE_BACKEND): с кэшем в памяти процесса
+(LocMemCache) и несколькими рабочими процессами gunicorn не запускается.
+
+Плавный перезапуск: сигнал HUP главному процессу (docker compose kill -s HUP app)
+запускает новые рабочие процессы с новым кодом и настройками, а старые
+дообслуживают начатые запросы в течение WEB_GRACEFUL_TIMEOUT секунд.
+"""
+
+import multiprocessing
+import os
+
+_cpus = multiprocessing.cpu_count()
+_asgi = os.getenv("ASYNC_VIEWS", "0") == "1"
+
+wsgi_app = "config.asgi:application" if _asgi else "config.wsgi:application"
+bind = os.getenv("WEB_BIND", "0.0.0.0:8080")
+
+if _asgi:
+    worker_class = "uvicorn.workers.UvicornWorker"
+    workers = int(os.getenv("WEB_WORKERS", _cpus))
+else:
+    worker_class = "gthread"
+    workers = int(os.getenv("WEB_WORKERS", _cpus * 2 + 1))
+    threads = int(os.getenv("WEB_THREADS", 4))
+
+# Рабочий процесс, который не отвечает главному WEB_TIMEOUT секунд, перезапускается
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("WEB_KEEPALIVE", 5))
+
+# Рабочий процесс перезапускается после стольких запросов (плюс случайный
+# разброс, чтобы процессы не перезапускались одновременно): утечки памяти
+# не накапливаются
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+
+# Приложение загружается в каждом рабочем процессе, а не в главном, чтобы
+# HUP подхватывал новый код
+preload_app = False
+
+# Файлы пульса рабочих процессов в памяти: в Docker /tmp может быть на медленном overlayfs
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Журнал запросов в stdout; пустое значение WEB_ACCESS_LOG отключает его
+accesslog = os.getenv("WEB_ACCESS_LOG", "-") or None
+errorlog = "-"
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+LOCAL_MEMORY_CACHE = "django.core.cache.backends.locmem.LocMemCache"
+
+
+def on_starting(server):
+    """
+    Останавливает запуск, если несколько рабочих процессов используют кэш
+    в памяти процесса: сброс кэша страниц в одном процессе не виден в
+    остальных, и они отдавали бы устаревшие страницы.
+    """
+    from django.conf import settings
+
+    if (
+        server.cfg.workers > 1
+        and settings.CACHES["default"]["BACKEND"] == LOCAL_MEMORY_CACHE
+    ):
+        raise RuntimeError(
+            f"{server.cfg.workers} рабочих процессов не могут использовать {LOCAL_MEMORY_CACHE}: "
+            "укажите общий кэш в CACHE_BACKEND и CACHE_LOCATION или WEB_WORKERS=1"
+        )
@@ -0,0 +1,122 @@
+"""
+Проверки работоспособности для оркестратора (healthcheck docker compose).
+
+HealthCheckMiddleware стоит первым в MIDDLEWARE и отвечает на LIVENESS_PATH и
+READINESS_PATH сам, не передавая запрос остальным middleware и
+представлениям: проверка не создает сессию, не проверяет заголовок Host
+(ALLOWED_HOSTS) и не рендерит страниц.
+
+- LIVENESS_PATH: процесс жив и обрабатывает запросы, ничего не проверяется.
+- READINESS_PATH: доступны основная база, реплика (если настроена) и кэш.
+  На каждую проверку базы PostgreSQL и на проверку кэша отводится
+  HEALTH_CHECK_TIMEOUT секунд.
+"""
+
+import logging
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpResponse, JsonResponse
+
+logger = logging.getLogger(__name__)
+
+LIVENESS_PATH = "/healthz/"
+READINESS_PATH = "/readyz/"
+
+
+def check_database(alias):
+    """
+    Выполняет SELECT 1 в базе alias.
+
+    В PostgreSQL запрос ограничен statement_timeout на HEALTH_CHECK_TIMEOUT
+    секунд внутри транзакции, поэтому ограничение не остается на соединении.
+    Время подключения ограничивает настройка connect_timeout базы.
+    """
+    connection = connections[alias]
+    with transaction.atomic(using=alias), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT set_config('statement_timeout', %s, true)",
+                [str(int(settings.HEALTH_CHECK_TIMEOUT * 1000))],
+            )
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+
+def _probe_cache():
+    value = uuid.uuid4().hex
+    cache.set("health:check", value, timeout=10)
+    if cache.get("health:check") != value:
+        raise RuntimeError("значение не сохранилось в кэше")
+
+
+def check_cache():
+    """
+    Записывает значение в кэш и читает его обратно.
+
+    Проверка выполняется в отдельном потоке и ограничена
+    HEALTH_CHECK_TIMEOUT секундами: зависший сервер кэша не задерживает
+    ответ /readyz/. Поток, не дождавшийся кэша, завершится по таймауту
+    сокета (OPTIONS кэша в config.settings_production).
+    """
+    errors = []
+
+    def probe():
+        try:
+            _probe_cache()
+        except Exception as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=probe, name="health-cache-check", daemon=True)
+    thread.start()
+    thread.join(settings.HEALTH_CHECK_TIMEOUT)
+    if thread.is_alive():
+        raise TimeoutError(f"кэш не ответил за {settings.HEALTH_CHECK_TIMEOUT} с")
+    if errors:
+        raise errors[0]
+
+
+def get_readiness():
+    """
+    Выполняет все проверки готовности.
+
+    Returns:
+        tuple: Признак готовности и результаты проверок {имя: "ok" или текст ошибки}.
+    """
+    aliases = [DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE]
+    checks = {
+        f"database:{alias}": (check_database, alias) for alias in aliases if alias
+    }
+    checks["cache"] = (check_cache,)
+    results = {}
+    for name, (check, *args) in checks.items():
+        try:
+            check(*args)
+            results[name] = "ok"
+        except Exception as error:
+            logger.warning("Проверка готовности %s не прошла: %r", name, error)
+            results[name] = repr(error)
+    return all(result == "ok" for result in results.values()), results
+
+
+class HealthCheckMiddleware:
+    """
+    Middleware, отвечающий на проверки работоспособности до остальных middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == LIVENESS_PATH:
+            return HttpResponse("ok", content_type="text/plain")
+        if request.path == READINESS_PATH:
+            ready, checks = get_readiness()
+            return JsonResponse(
+                {"status": "ok" if ready else "unavailable", "checks": checks},
+                status=200 if ready else 503,
+            )
+        return self.get_response(request)
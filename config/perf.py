@@ -0,0 +1,300 @@
+"""
+Замер производительности запросов.
+
+Включается настройкой PERF_INSTRUMENTATION: тогда в начало MIDDLEWARE
+добавляется PerformanceMiddleware. Для каждого запроса считаются запросы к
+базе и их время, время рендеринга шаблонов, попадания и промахи кэша и
+время запросов к Stripe. Результат отдается в заголовке Server-Timing,
+пишется в лог строкой JSON (логгер config.perf) и накапливается в сводке
+по представлениям, доступной персоналу (perf_summary).
+
+Сводка хранится в общем кэше (CACHE_BACKEND) счетчиками cache.incr, поэтому
+в ней собраны запросы всех рабочих процессов. Каждый запрос добавляет к
+счетчикам по одному обращению к кэшу на показатель.
+
+Когда настройка выключена, middleware не подключается и перехватчики не
+устанавливаются, поэтому замер ничего не стоит.
+"""
+
+import json
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import cache, caches
+from django.db import connections
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+_metrics = ContextVar("request_metrics", default=None)
+_installed = False
+_MISSING = object()
+
+# Показатели запроса, которые суммируются в сводке по представлениям
+METRIC_FIELDS = (
+    "total_ms",
+    "db_queries",
+    "db_ms",
+    "template_ms",
+    "cache_hits",
+    "cache_misses",
+    "cache_ms",
+    "stripe_calls",
+    "stripe_ms",
+)
+
+
+# Префикс ключей сводки в кэше
+SUMMARY_CACHE_PREFIX = "perf:summary"
+
+# Показатели хранятся целыми числами (cache.incr), умноженными на SUMMARY_SCALE
+SUMMARY_SCALE = 1000
+
+
+def _new_metrics():
+    return dict.fromkeys(METRIC_FIELDS, 0)
+
+
+def _add(elapsed_field, started, counter_field=None, count=1):
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics[elapsed_field] += (time.perf_counter() - started) * 1000
+        if counter_field:
+            metrics[counter_field] += count
+
+
+def _timed(func, elapsed_field, counter_field=None):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _add(elapsed_field, started, counter_field)
+
+    return wrapper
+
+
+def _atimed(func, elapsed_field, counter_field=None):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _add(elapsed_field, started, counter_field)
+
+    return wrapper
+
+
+def _count_cache_get(get):
+    @wraps(get)
+    def wrapper(self, key, default=None, version=None):
+        started = time.perf_counter()
+        value = get(self, key, _MISSING, version)
+        hit = value is not _MISSING
+        _add("cache_ms", started, "cache_hits" if hit else "cache_misses")
+        return value if hit else default
+
+    return wrapper
+
+
+def _count_cache_get_many(get_many):
+    @wraps(get_many)
+    def wrapper(self, keys, version=None):
+        keys = list(keys)
+        started = time.perf_counter()
+        values = get_many(self, keys, version)
+        _add("cache_ms", started, "cache_hits", len(values))
+        metrics = _metrics.get()
+        if metrics is not None:
+            metrics["cache_misses"] += len(keys) - len(values)
+        return values
+
+    return wrapper
+
+
+def install():
+    """
+    Устанавливает перехватчики рендеринга шаблонов, кэша и клиента Stripe.
+
+    Вызывается один раз при создании PerformanceMiddleware.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    from django.template.backends.django import Template
+
+    Template.render = _timed(Template.render, "template_ms")
+
+    for backend in {type(caches[alias]) for alias in settings.CACHES}:
+        backend.get = _count_cache_get(backend.get)
+        backend.get_many = _count_cache_get_many(backend.get_many)
+
+    import stripe
+
+    import users.services  # noqa: F401 - настраивает stripe.default_http_client
+
+    client = stripe.default_http_client
+    client.request_with_retries = _timed(
+        client.request_with_retries, "stripe_ms", "stripe_calls"
+    )
+    client.request_with_retries_async = _atimed(
+        client.request_with_retries_async, "stripe_ms", "stripe_calls"
+    )
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        _add("db_ms", started, "db_queries")
+
+
+def get_server_timing(metrics):
+    """
+    Возвращает значение заголовка Server-Timing для показателей запроса.
+    """
+    return ", ".join(
+        [
+            f'db;dur={metrics["db_ms"]:.1f};desc="{metrics["db_queries"]} queries"',
+            f'tpl;dur={metrics["template_ms"]:.1f}',
+            f'cache;dur={metrics["cache_ms"]:.1f};'
+            f'desc="hits={metrics["cache_hits"]} misses={metrics["cache_misses"]}"',
+            f'stripe;dur={metrics["stripe_ms"]:.1f};desc="{metrics["stripe_calls"]} calls"',
+            f'total;dur={metrics["total_ms"]:.1f}',
+        ]
+    )
+
+
+def _summary_key(*parts):
+    return ":".join([SUMMARY_CACHE_PREFIX, *parts])
+
+
+def _incr(key, delta):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Счетчика еще нет; если его успел создать другой процесс, add не
+        # сработает и значение добавляется к нему
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def _register_view(view_name):
+    # Имена представлений хранятся в пронумерованных ключах, чтобы сводку
+    # можно было прочитать без перебора ключей кэша
+    if cache.add(_summary_key("view", view_name), True, None):
+        cache.add(_summary_key("views"), 0, None)
+        number = cache.incr(_summary_key("views"))
+        cache.set(_summary_key("slot", str(number)), view_name, None)
+
+
+def record_summary(view_name, metrics):
+    """
+    Добавляет показатели запроса в сводку по представлению в общем кэше.
+    """
+    _register_view(view_name)
+    _incr(_summary_key(view_name, "requests"), 1)
+    for field in METRIC_FIELDS:
+        _incr(_summary_key(view_name, field), round(metrics[field] * SUMMARY_SCALE))
+
+
+def get_summary():
+    """
+    Возвращает средние показатели запросов по представлениям всех процессов.
+
+    Returns:
+        dict: Имя представления и количество запросов со средними показателями.
+    """
+    count = cache.get(_summary_key("views")) or 0
+    slots = [_summary_key("slot", str(number)) for number in range(1, count + 1)]
+    view_names = list(cache.get_many(slots).values())
+    fields = ("requests", *METRIC_FIELDS)
+    values = cache.get_many(
+        [_summary_key(view_name, field) for view_name in view_names for field in fields]
+    )
+
+    summary = {}
+    for view_name in view_names:
+        requests = values.get(_summary_key(view_name, "requests"))
+        if not requests:
+            continue
+        summary[view_name] = {
+            "requests": requests,
+            **{
+                f"avg_{field}": round(
+                    values.get(_summary_key(view_name, field), 0)
+                    / SUMMARY_SCALE
+                    / requests,
+                    2,
+                )
+                for field in METRIC_FIELDS
+            },
+        }
+    return summary
+
+
+class PerformanceMiddleware:
+    """
+    Middleware, замеряющий каждый запрос.
+
+    Показатели добавляются в заголовок Server-Timing, пишутся в лог
+    и суммируются по имени представления.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):
+        metrics = _new_metrics()
+        token = _metrics.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(_execute_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        metrics["total_ms"] = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        view_name = match.view_name if match else "unresolved"
+        response.headers["Server-Timing"] = get_server_timing(metrics)
+        record_summary(view_name, metrics)
+        logger.info(
+            json.dumps(
+                {
+                    "view": view_name,
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    **{field: round(value, 2) for field, value in metrics.items()},
+                }
+            )
+        )
+        return response
+
+
+@staff_member_required
+def perf_summary(request):
+    """
+    Сводка средних показателей запросов по представлениям для персонала.
+
+    Сводка хранится в общем кэше и собрана по всем рабочим процессам.
+    """
+    return JsonResponse(
+        {"enabled": settings.PERF_INSTRUMENTATION, "views": get_summary()}
+    )
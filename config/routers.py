@@ -0,0 +1,83 @@
+"""
+Маршрутизация запросов к базе между основной базой и репликой для чтения.
+
+Чтение идет на реплику (REPLICA_DATABASE), запись - в основную базу.
+После записи запрос до конца читает из основной базы, а клиент получает
+cookie, с которой его запросы следующие REPLICA_PIN_SECONDS секунд тоже
+читают из основной базы и видят свои изменения, даже если реплика отстает.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE_NAME = "pin_primary"
+
+_pinned = ContextVar("pinned_to_primary", default=False)
+_wrote = ContextVar("wrote_to_primary", default=False)
+
+
+class ReplicaRouter:
+    """
+    Роутер базы данных: чтение с реплики, запись в основную базу.
+
+    Methods:
+        db_for_read: Реплика, если она настроена и запрос не закреплен за основной базой.
+        db_for_write: Всегда основная база, закрепляет текущий запрос за ней.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = settings.REPLICA_DATABASE
+        if (
+            not replica
+            or _pinned.get()
+            or _wrote.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaPinningMiddleware:
+    """
+    Middleware, закрепляющий запрос за основной базой.
+
+    Запрос закрепляется, если это изменяющий запрос (POST и т.п.) или у клиента
+    есть cookie закрепления. Если во время запроса была запись, cookie
+    выставляется на REPLICA_PIN_SECONDS секунд.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = (
+            request.method not in ("GET", "HEAD", "OPTIONS")
+            or PIN_COOKIE_NAME in request.COOKIES
+        )
+        pinned_token = _pinned.set(pinned)
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get() and settings.REPLICA_DATABASE:
+                response.set_cookie(
+                    PIN_COOKIE_NAME,
+                    "1",
+                    max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True,
+                )
+            return response
+        finally:
+            _pinned.reset(pinned_token)
+            _wrote.reset(wrote_token)
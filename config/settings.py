@@ -40,12 +40,16 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "rest_framework",
     "blog",
     "users",
 ]
 
 MIDDLEWARE = [
+    # Проверки /healthz/ и /readyz/ отвечают до остальных middleware (config.health)
+    "config.health.HealthCheckMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "config.routers.ReplicaPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -54,6 +58,16 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Сколько секунд может выполняться запрос к базе и проверка кэша при проверке
+# готовности /readyz/
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", 1))
+
+# Замер производительности запросов: заголовок Server-Timing, строки лога
+# в формате JSON и сводка по представлениям для персонала (config.perf)
+PERF_INSTRUMENTATION = os.getenv("PERF_INSTRUMENTATION", "0") == "1"
+if PERF_INSTRUMENTATION:
+    MIDDLEWARE.insert(0, "config.perf.PerformanceMiddleware")
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -74,6 +88,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+# Асинхронные представления для запросов к Stripe. Включается при запуске
+# через ASGI-сервер (см. README, раздел "Запуск в режиме ASGI")
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "0") == "1"
+
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
@@ -88,6 +106,23 @@ DATABASES = {
     }
 }
 
+# Реплика PostgreSQL для чтения (необязательно). Если POSTGRES_REPLICA_HOST
+# не задан, все запросы идут в основную базу, а алиас replica указывает на нее
+# же и нужен только тестам маршрутизации: в тестах реплика - зеркало основной
+# базы (TEST MIRROR).
+REPLICA_DATABASE = "replica" if os.getenv("POSTGRES_REPLICA_HOST") else None
+DATABASES["replica"] = {
+    **DATABASES["default"],
+    "HOST": os.getenv("POSTGRES_REPLICA_HOST") or DATABASES["default"]["HOST"],
+    "PORT": os.getenv("POSTGRES_REPLICA_PORT") or DATABASES["default"]["PORT"],
+    "TEST": {"MIRROR": "default"},
+}
+
+DATABASE_ROUTERS = ["config.routers.ReplicaRouter"]
+
+# Сколько секунд после записи клиент читает из основной базы
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -136,10 +171,63 @@ NULLABLE = {"blank": True, "null": True}
 MEDIA_URL = "/media/"
 MEDIA_ROOT = "media"
 
+# Загруженные файлы (/media/) отдает само приложение (django.views.static.serve).
+# Установите SERVE_MEDIA=0, если их отдает внешний веб-сервер.
+SERVE_MEDIA = os.getenv("SERVE_MEDIA", "1") == "1"
+
+# Ширины уменьшенных копий изображений (preview статей и аватаров) в пикселях
+IMAGE_RENDITION_WIDTHS = (320, 640, 1280)
+
 AUTH_USER_MODEL = "users.User"
+LOGIN_URL = "users:login"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
 
 STRIPE_API_KEY = os.getenv("STRIPE_API_KEY")
 
 STRIPE_SUCCESS_URL = os.getenv("STRIPE_SUCCESS_URL")
+
+# Конфигурация полнотекстового поиска PostgreSQL (язык статей)
+BLOG_SEARCH_CONFIG = os.getenv("BLOG_SEARCH_CONFIG", "russian")
+
+# Срок доступа к платным статьям после оплаты в днях (0 - бессрочно)
+SUBSCRIPTION_PERIOD_DAYS = int(os.getenv("SUBSCRIPTION_PERIOD_DAYS", 0))
+
+# Адрес API Stripe можно подменить локальной заглушкой (например, stripe-mock)
+STRIPE_API_BASE = os.getenv("STRIPE_API_BASE", "https://api.stripe.com")
+# Таймаут одного запроса к Stripe в секундах
+STRIPE_TIMEOUT = float(os.getenv("STRIPE_TIMEOUT", 5))
+# Секрет подписи вебхуков Stripe. Если задан, статус оплаты приходит только
+# через вебхук и страницы блога не опрашивают Stripe
+STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+# Время жизни кэша статуса неоплаченной сессии в секундах
+PAYMENT_STATUS_CACHE_TIMEOUT = int(os.getenv("PAYMENT_STATUS_CACHE_TIMEOUT", 60))
+
+# Период сброса накопленных просмотров статей в базу в секундах (0 - без фонового потока)
+VIEW_COUNT_FLUSH_INTERVAL = int(os.getenv("VIEW_COUNT_FLUSH_INTERVAL", 10))
+
+# Время жизни кэша страниц блога для неавторизованных пользователей в секундах (0 - без кэша)
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", 300))
+
+# Популярные статьи: за сколько дней считать просмотры, сколько статей
+# показывать и как часто пересчитывать рейтинг (в секундах)
+TRENDING_WINDOW_DAYS = int(os.getenv("TRENDING_WINDOW_DAYS", 7))
+TRENDING_SIZE = int(os.getenv("TRENDING_SIZE", 10))
+TRENDING_REFRESH_INTERVAL = int(os.getenv("TRENDING_REFRESH_INTERVAL", 300))
+# Сколько дней хранить почасовую статистику просмотров
+VIEW_STATS_RETENTION_DAYS = int(os.getenv("VIEW_STATS_RETENTION_DAYS", 30))
+
+# Файл со словарем и TF-IDF векторами статей для пересчета похожих статей
+# (см. blog.related). Если файла нет, следующий запуск пересчитает все статьи.
+RELATED_INDEX_PATH = (
+    os.getenv("RELATED_INDEX_PATH") or BASE_DIR / "var" / "related_index.npz"
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
@@ -0,0 +1,69 @@
+"""
+Production settings for config project.
+
+Подключается через DJANGO_SETTINGS_MODULE=config.settings_production.
+Все значения берутся из переменных окружения (см. .env_example).
+"""
+
+import os
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import BASE_DIR, DATABASES, MIDDLEWARE
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host]
+
+# Постоянные соединения с базой: соединение переиспользуется между запросами
+# в течение DB_CONN_MAX_AGE секунд вместо нового подключения на каждый запрос.
+# Перед повторным использованием соединение проверяется (CONN_HEALTH_CHECKS),
+# поэтому обрыв соединения на стороне PostgreSQL не приводит к ошибке запроса.
+for database in DATABASES.values():
+    database.update(
+        {
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 600)),
+            "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "1") == "1",
+            "OPTIONS": {"connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", 5))},
+        }
+    )
+
+# Кэш общий для всех процессов: рабочих процессов gunicorn, run_jobs и команд
+# по расписанию. В кэше хранятся кэш страниц, рейтинг популярных статей и
+# статусы оплат; в кэше памяти процесса (LocMemCache) каждый рабочий процесс
+# видел бы только свои записи и сбросы. По умолчанию используется Redis.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND")
+        or "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_LOCATION") or "redis://localhost:6379/0",
+    }
+}
+
+# Таймауты подключения и ответа Redis: зависший сервер кэша дает ошибку,
+# а не зависший запрос
+if CACHES["default"]["BACKEND"] == "django.core.cache.backends.redis.RedisCache":
+    CACHES["default"]["OPTIONS"] = {
+        "socket_connect_timeout": float(os.getenv("CACHE_CONNECT_TIMEOUT", 1)),
+        "socket_timeout": float(os.getenv("CACHE_SOCKET_TIMEOUT", 1)),
+    }
+
+# Пул соединений PgBouncer в режиме transaction не поддерживает серверные
+# курсоры. При работе через такой пул установите DB_POOLER=pgbouncer и
+# DB_CONN_MAX_AGE=0: соединениями тогда управляет пул.
+if os.getenv("DB_POOLER") == "pgbouncer":
+    for database in DATABASES.values():
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# Статические файлы раздает приложение через WhiteNoise (gunicorn не умеет
+# этого сам). collectstatic создает рядом с файлами сжатые копии .gz и .br,
+# и WhiteNoise отдает их клиентам с поддержкой сжатия без сжатия на лету.
+STATIC_ROOT = os.getenv("STATIC_ROOT") or BASE_DIR / "staticfiles"
+MIDDLEWARE = list(MIDDLEWARE)
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedStaticFilesStorage"},
+}
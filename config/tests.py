@@ -0,0 +1,242 @@
+import os
+import runpy
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Blog
+from config.health import LIVENESS_PATH, READINESS_PATH
+from config.perf import METRIC_FIELDS, get_summary, record_summary
+from config.routers import PIN_COOKIE_NAME, ReplicaPinningMiddleware, ReplicaRouter
+from users.models import User
+
+
+@override_settings(REPLICA_DATABASE="replica", REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def handle(self, request, write=False):
+        """Выполняет запрос через middleware и возвращает базу чтения внутри запроса."""
+        databases = {}
+
+        def get_response(request):
+            if write:
+                self.router.db_for_write(Blog)
+            databases["read"] = self.router.db_for_read(Blog)
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(get_response)(request)
+        return databases["read"], response
+
+    def test_reads_go_to_replica(self):
+        read_db, response = self.handle(self.factory.get("/"))
+        self.assertEqual(read_db, "replica")
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_write_pins_client_to_primary(self):
+        read_db, response = self.handle(self.factory.post("/"), write=True)
+        self.assertEqual(read_db, "default")
+        self.assertEqual(response.cookies[PIN_COOKIE_NAME]["max-age"], 5)
+
+        request = self.factory.get("/")
+        request.COOKIES[PIN_COOKIE_NAME] = "1"
+        read_db, response = self.handle(request)
+        self.assertEqual(read_db, "default")
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_pin_does_not_leak_between_requests(self):
+        self.handle(self.factory.post("/"), write=True)
+        read_db, _ = self.handle(self.factory.get("/"))
+        self.assertEqual(read_db, "replica")
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_without_replica_reads_go_to_primary(self):
+        read_db, response = self.handle(self.factory.post("/"), write=True)
+        self.assertEqual(read_db, "default")
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+
+@override_settings(
+    REPLICA_DATABASE="replica", REPLICA_PIN_SECONDS=5, PAGE_CACHE_TIMEOUT=0
+)
+class ReplicaPinningTestCase(TransactionTestCase):
+    # В тестах реплика - зеркало основной базы (TEST MIRROR), поэтому видно,
+    # через какое соединение прошли запросы, а данные в обеих базах одинаковые.
+    # TestCase не подходит: внутри его транзакции чтение всегда идет в основную базу.
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(phone_number="+79000000010")
+        Blog.objects.create(title="first post", content="text", owner=self.user)
+
+    def get_list(self):
+        """Открывает ленту и возвращает ответ и количество запросов к основной базе и реплике."""
+        with CaptureQueriesContext(
+            connections["default"]
+        ) as primary, CaptureQueriesContext(connections["replica"]) as replica:
+            response = self.client.get(reverse("blog:blog_list"))
+        return response, len(primary), len(replica)
+
+    def test_write_pins_following_reads_to_primary(self):
+        response, primary, replica = self.get_list()
+        self.assertContains(response, "first post")
+        self.assertEqual((primary, replica > 0), (0, True))
+
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("blog:blog_create"), {"title": "second post", "content": "text"}
+        )
+        self.assertEqual(response.cookies[PIN_COOKIE_NAME]["max-age"], 5)
+
+        response, primary, replica = self.get_list()
+        self.assertContains(response, "second post")
+        self.assertEqual((primary > 0, replica), (True, 0))
+
+        # Cookie истекла: чтение снова идет на реплику
+        del self.client.cookies[PIN_COOKIE_NAME]
+        response, primary, replica = self.get_list()
+        self.assertContains(response, "second post")
+        self.assertEqual((primary, replica > 0), (0, True))
+
+
+class PerformanceMiddlewareTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        Blog.objects.create(title="blog", content="text")
+
+    def test_server_timing_and_summary(self):
+        middleware = ["config.perf.PerformanceMiddleware", *settings.MIDDLEWARE]
+        with override_settings(MIDDLEWARE=middleware, PERF_INSTRUMENTATION=True):
+            response = self.client.get(reverse("blog:blog_list"))
+            timing = response.headers["Server-Timing"]
+
+            self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+            self.assertIn("tpl;dur=", timing)
+            self.assertRegex(timing, r'cache;dur=[\d.]+;desc="hits=\d+ misses=[1-9]')
+
+            admin = User.objects.create(phone_number="+79000000008", is_staff=True)
+            self.client.force_login(admin)
+            summary = self.client.get(reverse("perf_summary")).json()
+
+        self.assertEqual(summary["views"]["blog:blog_list"]["requests"], 1)
+
+    def test_summary_is_stored_in_cache(self):
+        # Запросы, замеренные разными рабочими процессами, складываются в кэше
+        for total_ms in (10, 30):
+            record_summary(
+                "blog:blog_list",
+                {**dict.fromkeys(METRIC_FIELDS, 0), "total_ms": total_ms},
+            )
+
+        summary = get_summary()
+        self.assertEqual(summary["blog:blog_list"]["requests"], 2)
+        self.assertEqual(summary["blog:blog_list"]["avg_total_ms"], 20)
+
+        cache.clear()
+        self.assertEqual(get_summary(), {})
+
+
+@override_settings(ALLOWED_HOSTS=[])
+class HealthCheckTestCase(TestCase):
+    def test_liveness_skips_database(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(LIVENESS_PATH)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_readiness_checks_database_and_cache(self):
+        response = self.client.get(READINESS_PATH)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["checks"], {"database:default": "ok", "cache": "ok"}
+        )
+        self.assertNotIn("Vary", response.headers)
+
+    def test_readiness_fails_when_cache_is_down(self):
+        with patch("config.health._probe_cache", side_effect=ConnectionError("down")):
+            response = self.client.get(READINESS_PATH)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "unavailable")
+        self.assertIn("down", response.json()["checks"]["cache"])
+
+    @override_settings(HEALTH_CHECK_TIMEOUT=0.05)
+    def test_readiness_does_not_wait_for_hung_cache(self):
+        with patch(
+            "config.health._probe_cache",
+            side_effect=lambda: time.sleep(1),
+        ):
+            started = time.monotonic()
+            response = self.client.get(READINESS_PATH)
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("TimeoutError", response.json()["checks"]["cache"])
+
+
+class GunicornConfigTestCase(SimpleTestCase):
+    def load_config(self, **environ):
+        with patch.dict(os.environ, environ), patch(
+            "multiprocessing.cpu_count", return_value=4
+        ):
+            return runpy.run_path(
+                os.path.join(settings.BASE_DIR, "config", "gunicorn.conf.py")
+            )
+
+    def test_workers_derived_from_cpu_count(self):
+        config = self.load_config(ASYNC_VIEWS="0")
+
+        self.assertEqual((config["workers"], config["worker_class"]), (9, "gthread"))
+        self.assertEqual(config["wsgi_app"], "config.wsgi:application")
+        self.assertFalse(config["preload_app"])
+
+    def test_async_views_use_uvicorn_workers(self):
+        config = self.load_config(ASYNC_VIEWS="1", WEB_WORKERS="2")
+
+        self.assertEqual(config["workers"], 2)
+        self.assertEqual(config["worker_class"], "uvicorn.workers.UvicornWorker")
+        self.assertEqual(config["wsgi_app"], "config.asgi:application")
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_local_memory_cache_needs_single_worker(self):
+        on_starting = self.load_config()["on_starting"]
+
+        with self.assertRaisesMessage(RuntimeError, "CACHE_BACKEND"):
+            on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=9)))
+        on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=1)))
+
+
+@override_settings(DEBUG=False)
+class MediaServingTestCase(SimpleTestCase):
+    def test_media_is_served_without_debug(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with open(os.path.join(media_root, "photo.txt"), "w") as file:
+            file.write("media")
+
+        with override_settings(MEDIA_ROOT=media_root):
+            response = self.client.get("/media/photo.txt")
+            self.assertEqual(b"".join(response.streaming_content), b"media")
+            self.assertEqual(self.client.get("/media/missing.txt").status_code, 404)
@@ -16,12 +16,34 @@ Including another URLconf
 """
 
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+from django.views.static import serve
+
+from config.perf import perf_summary
+
+
+def serve_media(request, path):
+    """
+    Отдает загруженный файл из MEDIA_ROOT, в том числе при DEBUG=False.
+
+    serve отвечает 304 на условные запросы по Last-Modified файла.
+    """
+    return serve(request, path, document_root=settings.MEDIA_ROOT)
+
 
 urlpatterns = [
-                  path("admin/", admin.site.urls),
-                  path("", include("blog.urls", namespace="blog")),
-                  path("users/", include(("users.urls", "users"), namespace="users")),
-              ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path("admin/perf/", perf_summary, name="perf_summary"),
+    path("admin/", admin.site.urls),
+    path("", include("blog.urls", namespace="blog")),
+    path("users/", include(("users.urls", "users"), namespace="users")),
+]
+
+if settings.SERVE_MEDIA:
+    urlpatterns.append(
+        re_path(
+            rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.*)$",
+            serve_media,
+            name="media",
+        )
+    )
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from users.models import Subscription, User
+from users.models import Job, Plan, Subscription, User
 
 
 @admin.register(User)
@@ -13,6 +13,7 @@ class UserAdmin(admin.ModelAdmin):
         "is_active",
         "is_staff",
         "is_superuser",
+        "premium_until",
     )
     search_fields = ("phone_number", "first_name", "last_name")
 
@@ -22,3 +23,14 @@ class SubscriptionAdmin(admin.ModelAdmin):
     model = Subscription
     exclude = ("content_id", "user")
     search_fields = ("user",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_at", "created_at")
+    list_filter = ("status", "name")
+
+
+@admin.register(Plan)
+class PlanAdmin(admin.ModelAdmin):
+    list_display = ("lookup_key", "price_id")
@@ -1,6 +1,9 @@
 from django import forms
-from django.contrib.auth.forms import (PasswordResetForm, UserChangeForm,
-                                       UserCreationForm)
+from django.contrib.auth.forms import (
+    PasswordResetForm,
+    UserChangeForm,
+    UserCreationForm,
+)
 from django.forms import BooleanField, ModelForm
 
 from users.models import Subscription, User
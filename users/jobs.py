@@ -0,0 +1,138 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from config.settings import STRIPE_TIMEOUT
+from users.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Время в секундах, на которое воркер захватывает задачу. Если воркер не
+# завершил задачу за это время (например, упал), ее заберет другой воркер.
+# Задачи делают несколько запросов к Stripe, каждый ограничен STRIPE_TIMEOUT,
+# поэтому аренда с большим запасом длиннее: иначе задачу, которая еще
+# выполняется, забрал бы второй воркер.
+JOB_LEASE_SECONDS = max(300, 20 * STRIPE_TIMEOUT)
+# Базовая задержка повторной попытки в секундах, удваивается с каждой попыткой
+JOB_RETRY_DELAY = 5
+
+
+def get_job_name(func):
+    """
+    Возвращает имя задачи для функции - путь для импорта.
+
+    Args:
+        func (callable): Функция уровня модуля.
+
+    Returns:
+        str: Путь к функции, например "users.services.create_checkout_session".
+    """
+    return f"{func.__module__}.{func.__name__}"
+
+
+def enqueue(func, **kwargs):
+    """
+    Ставит вызов функции в очередь фоновых задач.
+
+    Args:
+        func (callable): Функция уровня модуля.
+        **kwargs: Именованные аргументы функции (должны сериализоваться в JSON).
+
+    Returns:
+        Job: Созданная задача.
+    """
+    return Job.objects.create(
+        name=get_job_name(func), payload=kwargs, run_at=timezone.now()
+    )
+
+
+async def aenqueue(func, **kwargs):
+    """
+    Асинхронная версия enqueue.
+    """
+    return await Job.objects.acreate(
+        name=get_job_name(func), payload=kwargs, run_at=timezone.now()
+    )
+
+
+def claim_job():
+    """
+    Захватывает следующую готовую к выполнению задачу.
+
+    На PostgreSQL строка блокируется через SELECT ... FOR UPDATE SKIP LOCKED,
+    поэтому несколько воркеров не получат одну и ту же задачу.
+
+    Задача с истекшей арендой (воркер упал или был убит во время ее
+    выполнения) захватывается снова, пока не исчерпаны max_attempts попыток;
+    после этого она помечается как неудачная.
+
+    Returns:
+        Job | None: Захваченная задача или None, если очередь пуста.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        Job.objects.filter(
+            status=Job.RUNNING, run_at__lte=now, attempts__gte=F("max_attempts")
+        ).update(status=Job.FAILED, last_error="Истекла аренда последней попытки")
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=Job.PENDING) | Q(status=Job.RUNNING), run_at__lte=now)
+            .order_by("run_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.run_at = now + timedelta(seconds=JOB_LEASE_SECONDS)
+        job.save(update_fields=["status", "attempts", "run_at"])
+    return job
+
+
+def run_job(job):
+    """
+    Выполняет задачу и сохраняет результат.
+
+    При ошибке задача откладывается с экспоненциальной задержкой, после
+    max_attempts попыток помечается как неудачная.
+
+    Args:
+        job (Job): Захваченная задача.
+
+    Returns:
+        bool: True, если задача выполнена успешно.
+    """
+    try:
+        import_string(job.name)(**job.payload)
+    except Exception as e:
+        logger.exception("Ошибка выполнения задачи %s", job.pk)
+        job.last_error = repr(e)
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+        else:
+            job.status = Job.PENDING
+            delay = JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            job.run_at = timezone.now() + timedelta(seconds=delay)
+        job.save(update_fields=["status", "run_at", "last_error"])
+        return False
+    job.status = Job.DONE
+    job.save(update_fields=["status"])
+    return True
+
+
+def run_next_job():
+    """
+    Захватывает и выполняет следующую задачу.
+
+    Returns:
+        bool: True, если задача была найдена.
+    """
+    job = claim_job()
+    if job is None:
+        return False
+    run_job(job)
+    return True
@@ -0,0 +1,54 @@
+from django.core.management import BaseCommand, CommandError
+
+from users.importers import IMPORT_BATCH_SIZE, IMPORT_FORMATS, import_users
+
+
+class Command(BaseCommand):
+    """
+    Django команда для импорта пользователей из JSONL или CSV.
+
+    Файл читается построчно и записывается пачками, поэтому подходит для
+    миллионов строк. Пользователи с существующим телефоном пропускаются.
+
+    Methods:
+        handle: Основной метод команды, который выполняет импорт.
+    """
+
+    help = "Импортирует пользователей из файла JSONL или CSV (можно сжатого gzip)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Формат файла (по умолчанию по расширению)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Размер пачки bulk_create",
+        )
+
+    def handle(self, *args, **options):
+        progress = self.write_progress if options["verbosity"] > 1 else None
+        try:
+            result = import_users(
+                options["path"],
+                file_format=options["format"],
+                batch_size=options["batch_size"],
+                progress=progress,
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Прочитано записей: {result['read']}, создано пользователей: {result['created']}"
+            )
+        )
+
+    def write_progress(self, read):
+        """
+        Выводит количество прочитанных записей после каждой пачки.
+        """
+        self.stdout.write(f"Прочитано записей: {read}")
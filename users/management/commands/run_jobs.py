@@ -0,0 +1,46 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+
+from users.jobs import run_next_job
+
+
+class Command(BaseCommand):
+    """
+    Django команда для запуска воркера очереди фоновых задач.
+
+    Воркер выполняет готовые задачи по одной и ждет новые, когда очередь пуста.
+    Можно запускать несколько воркеров одновременно.
+
+    Methods:
+        handle: Основной метод команды, который выполняет задачи из очереди.
+    """
+
+    help = "Выполняет фоновые задачи из очереди"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Выполнить готовые задачи и завершиться"
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Пауза в секундах при пустой очереди",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Выполняет задачи из очереди, пока не будет прерван (или пока очередь не опустеет с --once).
+        """
+        processed = 0
+        while True:
+            if run_next_job():
+                processed += 1
+                continue
+            if options["once"]:
+                break
+            close_old_connections()
+            time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"Выполнено задач: {processed}"))
@@ -0,0 +1,263 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:02
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Plan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "lookup_key",
+                    models.CharField(
+                        max_length=200, unique=True, verbose_name="Ключ цены"
+                    ),
+                ),
+                (
+                    "price_id",
+                    models.CharField(max_length=300, verbose_name="Цена в Stripe"),
+                ),
+            ],
+            options={
+                "verbose_name": "Тарифный план",
+                "verbose_name_plural": "Тарифные планы",
+            },
+        ),
+        migrations.CreateModel(
+            name="Subscription",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "content_id",
+                    models.CharField(
+                        blank=True,
+                        max_length=300,
+                        null=True,
+                        verbose_name="Индикатор страйпа",
+                    ),
+                ),
+                (
+                    "payment_data",
+                    models.DateField(
+                        auto_now=True, null=True, verbose_name="Дата оплаты"
+                    ),
+                ),
+                (
+                    "payment_session",
+                    models.CharField(
+                        blank=True,
+                        max_length=300,
+                        null=True,
+                        verbose_name="Сессия платежа",
+                    ),
+                ),
+                (
+                    "payment_url",
+                    models.URLField(
+                        blank=True,
+                        max_length=400,
+                        null=True,
+                        verbose_name="Ссылка для оплаты",
+                    ),
+                ),
+                (
+                    "price",
+                    models.DecimalField(
+                        decimal_places=2, default=5.0, max_digits=4, verbose_name="Цена"
+                    ),
+                ),
+                (
+                    "is_subscribed",
+                    models.BooleanField(default=False, verbose_name="Подписка"),
+                ),
+            ],
+            options={
+                "verbose_name": "Подписка",
+                "verbose_name_plural": "Подписки",
+            },
+        ),
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=200, verbose_name="Задача")),
+                ("payload", models.JSONField(default=dict, verbose_name="Аргументы")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Ожидает"),
+                            ("running", "Выполняется"),
+                            ("done", "Выполнена"),
+                            ("failed", "Ошибка"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="Попытки"),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveIntegerField(
+                        default=5, verbose_name="Максимум попыток"
+                    ),
+                ),
+                ("run_at", models.DateTimeField(verbose_name="Время запуска")),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True, null=True, verbose_name="Последняя ошибка"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Задача",
+                "verbose_name_plural": "Задачи",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_at"], name="users_job_status_a8cab5_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="User",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("password", models.CharField(max_length=128, verbose_name="password")),
+                (
+                    "last_login",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="last login"
+                    ),
+                ),
+                (
+                    "phone_number",
+                    models.CharField(
+                        max_length=40,
+                        unique=True,
+                        validators=[
+                            django.core.validators.RegexValidator(
+                                message="Номер телефона должен быть в формате: '+999999999'. Допустимая длина от 9 до 15 цифр.",
+                                regex="^\\+?1?\\d{9,15}$",
+                            )
+                        ],
+                        verbose_name="Телефон",
+                    ),
+                ),
+                (
+                    "avatar",
+                    models.ImageField(
+                        blank=True,
+                        null=True,
+                        upload_to="users/",
+                        verbose_name="Изображение",
+                    ),
+                ),
+                (
+                    "first_name",
+                    models.CharField(
+                        blank=True, max_length=30, null=True, verbose_name="Фамилия"
+                    ),
+                ),
+                (
+                    "last_name",
+                    models.CharField(
+                        blank=True, max_length=30, null=True, verbose_name="Имя"
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                ("is_staff", models.BooleanField(default=False)),
+                ("is_superuser", models.BooleanField(default=False)),
+                (
+                    "groups",
+                    models.ManyToManyField(
+                        blank=True,
+                        help_text="The groups this user belongs to. A user will get all permissions granted to each of their groups.",
+                        related_name="user_set",
+                        related_query_name="user",
+                        to="auth.group",
+                        verbose_name="groups",
+                    ),
+                ),
+                (
+                    "user_permissions",
+                    models.ManyToManyField(
+                        blank=True,
+                        help_text="Specific permissions for this user.",
+                        related_name="user_set",
+                        related_query_name="user",
+                        to="auth.permission",
+                        verbose_name="user permissions",
+                    ),
+                ),
+                (
+                    "payments",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="users.subscription",
+                        verbose_name="Ссылка на пользователя",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Пользователь",
+                "verbose_name_plural": "Пользователи",
+            },
+        ),
+    ]
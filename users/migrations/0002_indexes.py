@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="subscription",
+            constraint=models.UniqueConstraint(
+                fields=("content_id",), name="subscription_content_id_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:08
+
+from datetime import datetime, time, timedelta, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_premium_until(apps, schema_editor):
+    """
+    Заполняет premium_until пользователей с уже оплаченной подпиской.
+    """
+    User = apps.get_model("users", "User")
+    users = User.objects.filter(payments__is_subscribed=True).select_related("payments")
+    for user in users.iterator():
+        if settings.SUBSCRIPTION_PERIOD_DAYS and user.payments.payment_data:
+            paid_at = datetime.combine(
+                user.payments.payment_data, time(), tzinfo=timezone.utc
+            )
+            user.premium_until = paid_at + timedelta(
+                days=settings.SUBSCRIPTION_PERIOD_DAYS
+            )
+        else:
+            user.premium_until = datetime(9999, 1, 1, tzinfo=timezone.utc)
+        user.save(update_fields=["premium_until"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="premium_until",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Подписка действует до"
+            ),
+        ),
+        migrations.RunPython(fill_premium_until, migrations.RunPython.noop),
+    ]
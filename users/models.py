@@ -2,6 +2,7 @@ from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from config.settings import NULLABLE
@@ -89,6 +90,34 @@ class Subscription(models.Model):
     class Meta:
         verbose_name = "Подписка"
         verbose_name_plural = "Подписки"
+        constraints = [
+            # Подписка ищется по идентификатору сессии Stripe (вебхук, проверка оплаты)
+            models.UniqueConstraint(fields=["content_id"], name="subscription_content_id_uniq"),
+        ]
+
+
+class Plan(models.Model):
+    """
+    Тарифный план со ссылкой на цену в Stripe.
+
+    Attributes:
+        lookup_key (str): Ключ цены в Stripe (lookup_key).
+        price_id (str): Идентификатор цены в Stripe.
+
+    Meta:
+        verbose_name (str): Отображаемое имя модели в единственном числе.
+        verbose_name_plural (str): Отображаемое имя модели во множественном числе.
+    """
+
+    lookup_key = models.CharField(max_length=200, unique=True, verbose_name="Ключ цены")
+    price_id = models.CharField(max_length=300, verbose_name="Цена в Stripe")
+
+    def __str__(self):
+        return f"{self.lookup_key}"
+
+    class Meta:
+        verbose_name = "Тарифный план"
+        verbose_name_plural = "Тарифные планы"
 
 
 class User(AbstractBaseUser, PermissionsMixin):
@@ -103,6 +132,9 @@ class User(AbstractBaseUser, PermissionsMixin):
         is_active (bool): Активен ли пользователь.
         is_staff (bool): Является ли пользователь персоналом.
         is_superuser (bool): Является ли пользователь суперпользователем.
+        premium_until (DateTimeField): До какого времени открыт доступ к платным статьям.
+            Копия статуса подписки payments, чтобы проверка доступа не обращалась
+            к таблице подписок и к Stripe.
 
     Meta:
         verbose_name (str): Отображаемое имя модели в единственном числе.
@@ -130,6 +162,7 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name="Ссылка на пользователя",
         **NULLABLE,
     )
+    premium_until = models.DateTimeField(verbose_name="Подписка действует до", **NULLABLE)
 
     USERNAME_FIELD = "phone_number"
     REQUIRED_FIELDS = []
@@ -139,6 +172,63 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.phone_number}"
 
+    @property
+    def has_premium(self):
+        """
+        Возвращает True, если у пользователя действующая оплаченная подписка.
+        """
+        return self.premium_until is not None and self.premium_until > timezone.now()
+
     class Meta:
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
+
+
+class Job(models.Model):
+    """
+    Фоновая задача в очереди на базе данных.
+
+    Attributes:
+        name (str): Путь к функции задачи, например "users.services.create_checkout_session".
+        payload (dict): Именованные аргументы функции.
+        status (str): Статус задачи.
+        attempts (int): Количество выполненных попыток.
+        max_attempts (int): Максимальное количество попыток.
+        run_at (DateTimeField): Время, не раньше которого задачу можно выполнить.
+        last_error (str): Текст последней ошибки.
+        created_at (DateTimeField): Дата создания задачи.
+
+    Meta:
+        verbose_name (str): Отображаемое имя модели в единственном числе.
+        verbose_name_plural (str): Отображаемое имя модели во множественном числе.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Ожидает"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Выполнена"),
+        (FAILED, "Ошибка"),
+    ]
+
+    name = models.CharField(max_length=200, verbose_name="Задача")
+    payload = models.JSONField(default=dict, verbose_name="Аргументы")
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=PENDING, verbose_name="Статус"
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Попытки")
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name="Максимум попыток")
+    run_at = models.DateTimeField(verbose_name="Время запуска")
+    last_error = models.TextField(verbose_name="Последняя ошибка", **NULLABLE)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    class Meta:
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
+        indexes = [models.Index(fields=["status", "run_at"])]
@@ -1,64 +1,428 @@
-import stripe
+from datetime import datetime, timedelta, timezone
 
-from config.settings import STRIPE_API_KEY, STRIPE_SUCCESS_URL
+import stripe
+from django.core.cache import cache
+from django.db import transaction
 
+from config.settings import (
+    PAYMENT_STATUS_CACHE_TIMEOUT,
+    STRIPE_API_BASE,
+    STRIPE_API_KEY,
+    STRIPE_SUCCESS_URL,
+    STRIPE_TIMEOUT,
+    STRIPE_WEBHOOK_SECRET,
+    SUBSCRIPTION_PERIOD_DAYS,
+)
+from users.models import Plan, Subscription, User
 
 stripe.api_key = STRIPE_API_KEY
+stripe.api_base = STRIPE_API_BASE
+# Асинхронные методы Stripe (*_async) выполняются через httpx
+stripe.default_http_client = stripe.RequestsClient(
+    timeout=STRIPE_TIMEOUT,
+    async_fallback_client=stripe.HTTPXClient(timeout=STRIPE_TIMEOUT),
+)
+
 
+# Единственный тарифный план: разовая подписка за 1500 рублей
+SUBSCRIPTION_PLAN = {
+    "lookup_key": "subscription_1500_rub",
+    "currency": "rub",
+    "unit_amount": 1500 * 100,
+    "name": "Оплата выбранного продукта",
+}
 
-def create_stripe_product(pk, data):
+
+def create_stripe_price(plan):
     """
-    Создает продукт в Stripe.
+    Находит цену тарифного плана в Stripe по lookup_key или создает ее.
 
     Args:
-        pk (int): Идентификатор продукта.
-        data (str): Данные для описания продукта.
+        plan (dict): Тарифный план (lookup_key, currency, unit_amount, name).
 
     Returns:
-        str: Идентификатор созданного продукта в Stripe.
+        str: Идентификатор цены в Stripe.
     """
-    description = str(pk) + "дата платежа" + str(data)
-    payment = stripe.Product.create(name=f"{pk}", description=description)
-    return payment.get("id")
+    prices = stripe.Price.list(lookup_keys=[plan["lookup_key"]], active=True, limit=1)
+    if prices.data:
+        return prices.data[0]["id"]
+    stripe_price = stripe.Price.create(
+        currency=plan["currency"],
+        unit_amount=plan["unit_amount"],
+        product_data={"name": plan["name"]},
+        lookup_key=plan["lookup_key"],
+    )
+    return stripe_price.get("id")
 
 
-def create_stripe_price():
+def get_plan_price_id(plan=SUBSCRIPTION_PLAN):
     """
-    Создает цену в Stripe.
+    Возвращает идентификатор цены тарифного плана в Stripe.
+
+    Идентификатор хранится в таблице Plan и в кэше, поэтому Stripe
+    запрашивается только один раз за все время работы приложения.
+
+    Args:
+        plan (dict): Тарифный план.
 
     Returns:
-        dict: Информация о созданной цене в Stripe.
+        str: Идентификатор цены в Stripe.
     """
-    stripe_price = stripe.Price.create(
-        currency="rub",
-        unit_amount=1500 * 100,
-        product_data={"name": "Оплата выбранного продукта"},
+    cache_key = f"stripe_price:{plan['lookup_key']}"
+    price_id = cache.get(cache_key)
+    if price_id is None:
+        stored_plan = Plan.objects.filter(lookup_key=plan["lookup_key"]).first()
+        if stored_plan is None:
+            stored_plan, _ = Plan.objects.get_or_create(
+                lookup_key=plan["lookup_key"],
+                defaults={"price_id": create_stripe_price(plan)},
+            )
+        price_id = stored_plan.price_id
+        cache.set(cache_key, price_id, None)
+    return price_id
+
+
+async def acreate_stripe_price(plan):
+    """
+    Асинхронная версия create_stripe_price.
+    """
+    prices = await stripe.Price.list_async(lookup_keys=[plan["lookup_key"]], active=True, limit=1)
+    if prices.data:
+        return prices.data[0]["id"]
+    stripe_price = await stripe.Price.create_async(
+        currency=plan["currency"],
+        unit_amount=plan["unit_amount"],
+        product_data={"name": plan["name"]},
+        lookup_key=plan["lookup_key"],
     )
-    return stripe_price
+    return stripe_price.get("id")
+
+
+async def aget_plan_price_id(plan=SUBSCRIPTION_PLAN):
+    """
+    Асинхронная версия get_plan_price_id.
+    """
+    cache_key = f"stripe_price:{plan['lookup_key']}"
+    price_id = await cache.aget(cache_key)
+    if price_id is None:
+        stored_plan = await Plan.objects.filter(lookup_key=plan["lookup_key"]).afirst()
+        if stored_plan is None:
+            stored_plan, _ = await Plan.objects.aget_or_create(
+                lookup_key=plan["lookup_key"],
+                defaults={"price_id": await acreate_stripe_price(plan)},
+            )
+        price_id = stored_plan.price_id
+        await cache.aset(cache_key, price_id, None)
+    return price_id
 
 
-def create_stripe_session(price):
+def create_stripe_session(price_id, idempotency_key=None):
     """
     Создает сессию оплаты в Stripe.
 
     Args:
-        price (dict): Информация о цене в Stripe.
+        price_id (str): Идентификатор цены в Stripe.
+        idempotency_key (str, optional): Ключ идемпотентности: повторный
+            запрос с тем же ключом возвращает уже созданную сессию.
 
     Returns:
         tuple: Идентификатор и URL созданной сессии оплаты в Stripe.
     """
     session = stripe.checkout.Session.create(
         success_url=STRIPE_SUCCESS_URL,
-        line_items=[{"price": price.get("id"), "quantity": 1}],
+        line_items=[{"price": price_id, "quantity": 1}],
+        mode="payment",
+        idempotency_key=idempotency_key,
+    )
+    return session.get("id"), session.get("url")
+
+
+async def acreate_stripe_session(price_id, idempotency_key=None):
+    """
+    Асинхронная версия create_stripe_session.
+    """
+    session = await stripe.checkout.Session.create_async(
+        success_url=STRIPE_SUCCESS_URL,
+        line_items=[{"price": price_id, "quantity": 1}],
         mode="payment",
+        idempotency_key=idempotency_key,
     )
     return session.get("id"), session.get("url")
 
 
+def get_checkout_idempotency_key(subscription_id):
+    """
+    Возвращает ключ идемпотентности Stripe для сессии оплаты подписки.
+    """
+    return f"checkout-session-{subscription_id}"
+
+
+def create_checkout_session(subscription_id):
+    """
+    Создает в Stripe сессию оплаты для подписки. Выполняется фоновой задачей.
+
+    Цена тарифа берется из локального реестра, поэтому обычно нужен
+    единственный запрос к Stripe. Повторный запуск для подписки, у которой
+    уже есть ссылка на оплату, ничего не делает. Сессия создается с ключом
+    идемпотентности подписки, поэтому два одновременных запуска (например,
+    после истечения аренды задачи) получат одну и ту же сессию.
+
+    Args:
+        subscription_id (int): Идентификатор подписки.
+    """
+    subscription = Subscription.objects.get(pk=subscription_id)
+    if subscription.payment_url:
+        return
+    session_id, payment_url = create_stripe_session(
+        get_plan_price_id(), get_checkout_idempotency_key(subscription.pk)
+    )
+    Subscription.objects.filter(pk=subscription.pk).update(
+        content_id=session_id, payment_url=payment_url
+    )
+
+
+async def acreate_checkout_session(subscription_id):
+    """
+    Асинхронная версия create_checkout_session.
+
+    Returns:
+        str: Ссылка на оплату.
+    """
+    subscription = await Subscription.objects.aget(pk=subscription_id)
+    if subscription.payment_url:
+        return subscription.payment_url
+    session_id, payment_url = await acreate_stripe_session(
+        await aget_plan_price_id(), get_checkout_idempotency_key(subscription.pk)
+    )
+    await Subscription.objects.filter(pk=subscription.pk).aupdate(
+        content_id=session_id, payment_url=payment_url
+    )
+    return payment_url
+
+
 def check_payment_status(payment_intent_id):
     try:
         payment_intent = stripe.checkout.Session.retrieve(payment_intent_id)
         return payment_intent["payment_status"] == 'paid'
-    except stripe.error.StripeError as e:
+    except stripe.error.StripeError:
         # Обработка ошибок Stripe
         return False
+
+
+async def acheck_payment_status(payment_intent_id):
+    """
+    Асинхронная версия check_payment_status.
+    """
+    try:
+        payment_intent = await stripe.checkout.Session.retrieve_async(payment_intent_id)
+        return payment_intent["payment_status"] == "paid"
+    except stripe.error.StripeError:
+        return False
+
+
+def get_payment_status_cache_key(content_id):
+    """
+    Возвращает ключ кэша для статуса оплаты сессии Stripe.
+
+    Args:
+        content_id (str): Идентификатор сессии Stripe.
+
+    Returns:
+        str: Ключ кэша.
+    """
+    return f"payment_status:{content_id}"
+
+
+def invalidate_payment_status(content_id):
+    """
+    Удаляет из кэша сохраненный статус оплаты сессии Stripe.
+
+    Args:
+        content_id (str): Идентификатор сессии Stripe.
+    """
+    cache.delete(get_payment_status_cache_key(content_id))
+
+
+# Срок доступа при бессрочной подписке (SUBSCRIPTION_PERIOD_DAYS = 0)
+PREMIUM_FOREVER = datetime(9999, 1, 1, tzinfo=timezone.utc)
+
+
+def get_premium_until(paid_at):
+    """
+    Возвращает время окончания доступа к платным статьям для оплаты.
+
+    Args:
+        paid_at (datetime): Время оплаты.
+
+    Returns:
+        datetime: Время окончания доступа.
+    """
+    if not SUBSCRIPTION_PERIOD_DAYS:
+        return PREMIUM_FOREVER
+    return paid_at + timedelta(days=SUBSCRIPTION_PERIOD_DAYS)
+
+
+def grant_premium(subscriptions, paid_at):
+    """
+    Открывает доступ к платным статьям пользователям с оплаченными подписками.
+
+    Args:
+        subscriptions (QuerySet): Оплаченные подписки.
+        paid_at (datetime): Время оплаты.
+
+    Returns:
+        int: Количество обновленных пользователей.
+    """
+    return User.objects.filter(payments__in=subscriptions).update(
+        premium_until=get_premium_until(paid_at)
+    )
+
+
+def revoke_premium(subscriptions):
+    """
+    Закрывает доступ к платным статьям пользователям с указанными подписками.
+
+    Args:
+        subscriptions (QuerySet): Неоплаченные или удаляемые подписки.
+
+    Returns:
+        int: Количество обновленных пользователей.
+    """
+    return User.objects.filter(payments__in=subscriptions).update(premium_until=None)
+
+
+def check_subscription_status(subscription):
+    """
+    Проверяет, оплачена ли подписка, обращаясь к Stripe как можно реже.
+
+    Оплаченная подписка сохраняется в Subscription.is_subscribed и в
+    User.premium_until владельца и дальше проверяется без запросов к Stripe. Статус неоплаченной сессии (в том числе
+    при недоступности Stripe) кэшируется на PAYMENT_STATUS_CACHE_TIMEOUT секунд.
+    Если настроен вебхук (STRIPE_WEBHOOK_SECRET), Stripe не опрашивается вовсе.
+
+    Args:
+        subscription (Subscription | None): Подписка пользователя.
+
+    Returns:
+        bool: True, если подписка оплачена.
+    """
+    if subscription is None:
+        return False
+    if subscription.is_subscribed:
+        return True
+    if not subscription.content_id or STRIPE_WEBHOOK_SECRET:
+        return False
+
+    cache_key = get_payment_status_cache_key(subscription.content_id)
+    is_paid = cache.get(cache_key)
+    if is_paid is None:
+        is_paid = check_payment_status(subscription.content_id)
+        if not is_paid:
+            cache.set(cache_key, False, PAYMENT_STATUS_CACHE_TIMEOUT)
+
+    if is_paid:
+        subscriptions = Subscription.objects.filter(pk=subscription.pk)
+        subscriptions.update(is_subscribed=True)
+        grant_premium(subscriptions, datetime.now(timezone.utc))
+        subscription.is_subscribed = True
+        invalidate_payment_status(subscription.content_id)
+    return is_paid
+
+
+async def acheck_subscription_status(subscription):
+    """
+    Асинхронная версия check_subscription_status.
+    """
+    if subscription is None:
+        return False
+    if subscription.is_subscribed:
+        return True
+    if not subscription.content_id or STRIPE_WEBHOOK_SECRET:
+        return False
+
+    cache_key = get_payment_status_cache_key(subscription.content_id)
+    is_paid = await cache.aget(cache_key)
+    if is_paid is None:
+        is_paid = await acheck_payment_status(subscription.content_id)
+        if not is_paid:
+            await cache.aset(cache_key, False, PAYMENT_STATUS_CACHE_TIMEOUT)
+
+    if is_paid:
+        subscriptions = Subscription.objects.filter(pk=subscription.pk)
+        await subscriptions.aupdate(is_subscribed=True)
+        await User.objects.filter(payments__in=subscriptions).aupdate(
+            premium_until=get_premium_until(datetime.now(timezone.utc))
+        )
+        subscription.is_subscribed = True
+        await cache.adelete(cache_key)
+    return is_paid
+
+
+def refresh_subscription_status(subscription_id, user_id):
+    """
+    Проверяет оплату прошлой подписки пользователя в Stripe. Выполняется
+    фоновой задачей, когда вебхук не настроен: представления читают только
+    сохраненный статус и не обращаются к Stripe в запросе.
+
+    Пока задача ждала в очереди, пользователь уже получил новую подписку,
+    поэтому при оплате прошлой он снова связывается с ней и получает доступ
+    к платным статьям.
+
+    Args:
+        subscription_id (int): Идентификатор прошлой подписки.
+        user_id (int): Идентификатор пользователя.
+    """
+    subscription = Subscription.objects.filter(pk=subscription_id, is_subscribed=False).first()
+    if subscription is not None and check_subscription_status(subscription):
+        User.objects.filter(pk=user_id).update(payments=subscription)
+        grant_premium(Subscription.objects.filter(pk=subscription_id), datetime.now(timezone.utc))
+
+
+# События Stripe, которые меняют статус оплаты сессии
+CHECKOUT_SESSION_EVENTS = (
+    "checkout.session.completed",
+    "checkout.session.async_payment_succeeded",
+    "checkout.session.async_payment_failed",
+    "checkout.session.expired",
+)
+
+
+def apply_checkout_session_event(event):
+    """
+    Сохраняет статус оплаты из события вебхука Stripe.
+
+    Подписка и доступ ее владельца к платным статьям обновляются запросами
+    UPDATE в одной транзакции, поэтому повторная доставка того же события
+    ничего не меняет. Stripe не гарантирует порядок событий, поэтому
+    неоплаченный статус (checkout.session.expired или запоздавший
+    checkout.session.completed) не отменяет уже сохраненную оплату.
+
+    Args:
+        event (dict): Событие Stripe с объектом checkout.session.
+
+    Returns:
+        int: Количество обновленных подписок.
+    """
+    if event["type"] not in CHECKOUT_SESSION_EVENTS:
+        return 0
+
+    session = event["data"]["object"]
+    is_paid = (
+        event["type"] != "checkout.session.async_payment_failed"
+        and session.get("payment_status") == "paid"
+    )
+    paid_at = datetime.fromtimestamp(event["created"], tz=timezone.utc)
+    fields = {"is_subscribed": is_paid}
+    if is_paid:
+        fields["payment_data"] = paid_at.date()
+    subscriptions = Subscription.objects.filter(content_id=session["id"])
+    if not is_paid:
+        subscriptions = subscriptions.filter(is_subscribed=False)
+    with transaction.atomic():
+        updated = subscriptions.update(**fields)
+        if is_paid:
+            grant_premium(subscriptions, paid_at)
+        else:
+            revoke_premium(subscriptions)
+    invalidate_payment_status(session["id"])
+    return updated
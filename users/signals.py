@@ -0,0 +1,44 @@
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.images import refresh_renditions
+from users.models import Subscription, User
+from users.services import grant_premium, revoke_premium
+
+
+@receiver(post_save, sender=Subscription)
+def sync_premium_until(sender, instance, **kwargs):
+    """
+    Переносит статус подписки, измененный через save (например, в админке),
+    в User.premium_until владельца.
+    """
+    subscriptions = Subscription.objects.filter(pk=instance.pk)
+    if instance.is_subscribed:
+        grant_premium(
+            subscriptions.filter(user__premium_until__isnull=True), timezone.now()
+        )
+    else:
+        revoke_premium(subscriptions)
+
+
+@receiver(pre_delete, sender=Subscription)
+def revoke_premium_on_delete(sender, instance, **kwargs):
+    """
+    Закрывает доступ к платным статьям владельцу удаляемой подписки.
+    """
+    revoke_premium(Subscription.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=User)
+def create_avatar_renditions(sender, instance, update_fields=None, **kwargs):
+    """
+    Создает уменьшенные копии и WebP-версии аватара пользователя.
+
+    Сохранения отдельных полей без аватара (например, last_login при входе)
+    изображение не трогают.
+    """
+    if update_fields is not None and "avatar" not in update_fields:
+        return
+    if instance.avatar:
+        refresh_renditions(instance.avatar)
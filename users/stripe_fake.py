@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+import uuid
+import zlib
+from urllib.parse import parse_qs, urlsplit
+
+import stripe
+
+
+class FakeStripeClient(stripe.HTTPClient):
+    """
+    HTTP-клиент Stripe, который отвечает сам, без обращения к сети.
+
+    Нужен для нагрузочного тестирования (см. команду run_benchmark): запросы
+    к Stripe из users.services проходят через настоящий клиент библиотеки
+    stripe, но отвечает им этот класс с заданной задержкой.
+
+    Поддерживаются запросы, которые выполняет users.services: поиск и создание
+    цены, создание и получение сессии оплаты. Полученная сессия считается
+    оплаченной с вероятностью paid_ratio.
+
+    Attributes:
+        latency (float): Задержка ответа в секундах.
+        paid_ratio (float): Доля оплаченных сессий.
+        calls (int): Количество выполненных запросов.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency=0.0, paid_ratio=0.0):
+        super().__init__()
+        self.latency = latency
+        self.paid_ratio = paid_ratio
+        self.calls = 0
+
+    def request(self, method, url, headers, post_data=None, *, _usage=None):
+        time.sleep(self.latency)
+        return self.respond(method, url, post_data)
+
+    async def request_async(self, method, url, headers, post_data=None, *, _usage=None):
+        await asyncio.sleep(self.latency)
+        return self.respond(method, url, post_data)
+
+    def close(self):
+        pass
+
+    async def close_async(self):
+        pass
+
+    def respond(self, method, url, post_data):
+        """
+        Возвращает ответ Stripe: тело в JSON, код ответа и заголовки.
+        """
+        self.calls += 1
+        path = urlsplit(url).path
+        data = {key: values[0] for key, values in parse_qs(post_data or "").items()}
+
+        if path == "/v1/prices" and method == "get":
+            body = {"object": "list", "url": path, "has_more": False, "data": []}
+        elif path == "/v1/prices" and method == "post":
+            body = {
+                "id": f"price_fake_{uuid.uuid4().hex}",
+                "object": "price",
+                "lookup_key": data.get("lookup_key"),
+            }
+        elif path == "/v1/checkout/sessions" and method == "post":
+            session_id = f"cs_fake_{uuid.uuid4().hex}"
+            body = {
+                "id": session_id,
+                "object": "checkout.session",
+                "payment_status": "unpaid",
+                "url": f"https://checkout.stripe.test/{session_id}",
+            }
+        elif path.startswith("/v1/checkout/sessions/") and method == "get":
+            session_id = path.rsplit("/", 1)[1]
+            paid = zlib.crc32(session_id.encode()) % 100 < self.paid_ratio * 100
+            body = {
+                "id": session_id,
+                "object": "checkout.session",
+                "payment_status": "paid" if paid else "unpaid",
+            }
+        else:
+            body = {
+                "error": {
+                    "type": "invalid_request_error",
+                    "message": f"Unknown path {path}",
+                }
+            }
+            return json.dumps(body), 404, {}
+        return json.dumps(body), 200, {}
@@ -1,3 +1,354 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import os
+import shutil
+import tempfile
+import time
+from io import BytesIO
+from unittest.mock import AsyncMock, patch
 
-# Create your tests here.
+import stripe
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from config.settings import STRIPE_SUCCESS_URL
+from users.importers import import_users
+from users.jobs import enqueue, run_next_job
+from users.models import Job, Subscription, User
+from users.services import check_subscription_status, create_checkout_session
+from users.views import SubscriptionCreateAsync
+
+
+class SubscriptionStatusTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.subscription = Subscription.objects.create(content_id="cs_test_1")
+
+    @patch("stripe.checkout.Session.retrieve")
+    def test_paid_status_is_stored(self, retrieve):
+        retrieve.return_value = {"payment_status": "paid"}
+
+        self.assertTrue(check_subscription_status(self.subscription))
+        self.assertTrue(check_subscription_status(self.subscription))
+
+        self.assertEqual(retrieve.call_count, 1)
+        self.subscription.refresh_from_db()
+        self.assertTrue(self.subscription.is_subscribed)
+
+    @patch("stripe.checkout.Session.retrieve")
+    def test_unpaid_status_is_cached(self, retrieve):
+        retrieve.return_value = {"payment_status": "unpaid"}
+
+        self.assertFalse(check_subscription_status(self.subscription))
+        self.assertFalse(check_subscription_status(self.subscription))
+
+        self.assertEqual(retrieve.call_count, 1)
+
+    @patch("stripe.checkout.Session.retrieve")
+    def test_stripe_error_is_cached(self, retrieve):
+        retrieve.side_effect = stripe.error.APIConnectionError("timeout")
+
+        self.assertFalse(check_subscription_status(self.subscription))
+        self.assertFalse(check_subscription_status(self.subscription))
+
+        self.assertEqual(retrieve.call_count, 1)
+
+
+class StripeWebhookTestCase(TestCase):
+    secret = "whsec_test"
+
+    def setUp(self):
+        self.subscription = Subscription.objects.create(content_id="cs_test_2")
+        self.user = User.objects.create(
+            phone_number="+79000000006", payments=self.subscription
+        )
+        patcher = patch("users.views.STRIPE_WEBHOOK_SECRET", self.secret)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post_event(self, event_type, payment_status, signature=None):
+        payload = json.dumps(
+            {
+                "id": "evt_test",
+                "object": "event",
+                "type": event_type,
+                "created": 1720800000,
+                "data": {
+                    "object": {"id": "cs_test_2", "payment_status": payment_status}
+                },
+            }
+        )
+        timestamp = int(time.time())
+        if signature is None:
+            signature = hmac.new(
+                self.secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256
+            ).hexdigest()
+        return self.client.post(
+            reverse("users:stripe_webhook"),
+            data=payload,
+            content_type="application/json",
+            HTTP_STRIPE_SIGNATURE=f"t={timestamp},v1={signature}",
+        )
+
+    def test_completed_session_marks_subscription_paid(self):
+        for _ in range(2):
+            response = self.post_event("checkout.session.completed", "paid")
+            self.assertEqual(response.status_code, 200)
+
+        self.subscription.refresh_from_db()
+        self.assertTrue(self.subscription.is_subscribed)
+        self.assertEqual(str(self.subscription.payment_data), "2024-07-12")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.has_premium)
+
+    def test_expired_session_revokes_premium(self):
+        User.objects.filter(pk=self.user.pk).update(premium_until=timezone.now())
+        self.post_event("checkout.session.expired", "unpaid")
+
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.premium_until)
+
+    def test_late_unpaid_event_keeps_paid_subscription(self):
+        self.post_event("checkout.session.async_payment_succeeded", "paid")
+        self.post_event("checkout.session.completed", "unpaid")
+        self.post_event("checkout.session.expired", "unpaid")
+
+        self.subscription.refresh_from_db()
+        self.assertTrue(self.subscription.is_subscribed)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.has_premium)
+
+    def test_invalid_signature_is_rejected(self):
+        response = self.post_event(
+            "checkout.session.completed", "paid", signature="bad"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.subscription.refresh_from_db()
+        self.assertFalse(self.subscription.is_subscribed)
+
+
+class CheckoutJobTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(phone_number="+79000000003")
+        self.client.force_login(self.user)
+
+    @patch("users.services.check_payment_status", return_value=False)
+    @patch(
+        "stripe.checkout.Session.create",
+        side_effect=[
+            {"id": "cs_test_3", "url": "https://pay.test/3"},
+            {"id": "cs_test_5", "url": "https://pay.test/5"},
+        ],
+    )
+    @patch("stripe.Price.create", return_value={"id": "price_test"})
+    @patch(
+        "stripe.Price.list",
+        return_value=stripe.ListObject.construct_from({"data": []}, None),
+    )
+    def test_checkout_session_is_created_by_worker(
+        self, price_list, price_create, session_create, check_payment_status
+    ):
+        response = self.client.get(reverse("users:perform_create"))
+        self.user.refresh_from_db()
+        status_url = reverse("users:checkout_status", args=[self.user.payments_id])
+        self.assertRedirects(response, status_url)
+        self.assertContains(self.client.get(status_url), "Готовим страницу оплаты")
+
+        self.assertTrue(run_next_job())
+        self.assertFalse(run_next_job())
+
+        response = self.client.get(status_url)
+        self.assertRedirects(
+            response, "https://pay.test/3", fetch_redirect_response=False
+        )
+        self.assertEqual(
+            Subscription.objects.get(user=self.user).content_id, "cs_test_3"
+        )
+
+        # Оплата прошлой сессии проверяется воркером, а не в запросе
+        self.client.get(reverse("users:perform_create"))
+        check_payment_status.assert_not_called()
+        while run_next_job():
+            pass
+        check_payment_status.assert_called_once_with("cs_test_3")
+        self.assertEqual(price_create.call_count, 1)
+        self.assertEqual(session_create.call_count, 2)
+        self.user.refresh_from_db()
+        session_create.assert_called_with(
+            success_url=STRIPE_SUCCESS_URL,
+            line_items=[{"price": "price_test", "quantity": 1}],
+            mode="payment",
+            idempotency_key=f"checkout-session-{self.user.payments_id}",
+        )
+
+    @patch("users.services.check_payment_status", return_value=True)
+    @patch(
+        "users.services.create_stripe_session",
+        return_value=("cs_test_7", "https://pay.test/7"),
+    )
+    @patch("users.services.get_plan_price_id", return_value="price_test")
+    def test_paid_previous_session_is_not_paid_again(self, *stripe_calls):
+        subscription = Subscription.objects.create(
+            content_id="cs_test_6", payment_url="https://pay.test/6"
+        )
+        User.objects.filter(pk=self.user.pk).update(payments=subscription)
+
+        response = self.client.get(reverse("users:perform_create"))
+        while run_next_job():
+            pass
+
+        self.assertContains(self.client.get(response.url), "Вы уже подписались")
+
+    @patch(
+        "users.services.create_stripe_session",
+        side_effect=stripe.error.APIConnectionError("timeout"),
+    )
+    @patch("users.services.get_plan_price_id", return_value="price_test")
+    def test_failed_job_is_retried_with_backoff(self, *stripe_calls):
+        subscription = Subscription.objects.create()
+        job = enqueue(create_checkout_session, subscription_id=subscription.pk)
+
+        with self.assertLogs("users.jobs", level="ERROR"):
+            self.assertTrue(run_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertFalse(run_next_job())
+
+        Job.objects.filter(pk=job.pk).update(
+            attempts=job.max_attempts - 1, run_at=timezone.now()
+        )
+        with self.assertLogs("users.jobs", level="ERROR"):
+            run_next_job()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    def test_expired_lease_of_last_attempt_fails_job(self):
+        subscription = Subscription.objects.create()
+        job = enqueue(create_checkout_session, subscription_id=subscription.pk)
+        # Воркер захватил последнюю попытку и был убит, аренда истекла
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING, attempts=job.max_attempts, run_at=timezone.now()
+        )
+
+        self.assertFalse(run_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+
+class SubscriptionCreateAsyncTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(phone_number="+79000000004")
+
+    def get_request(self):
+        request = AsyncRequestFactory().get(reverse("users:perform_create"))
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+        return request
+
+    @patch("stripe.checkout.Session.create_async", new_callable=AsyncMock)
+    @patch(
+        "users.services.aget_plan_price_id",
+        new_callable=AsyncMock,
+        return_value="price_test",
+    )
+    async def test_checkout_session_is_created_in_request(
+        self, price_id, session_create
+    ):
+        session_create.return_value = {"id": "cs_test_4", "url": "https://pay.test/4"}
+
+        response = await SubscriptionCreateAsync.as_view()(self.get_request())
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, "https://pay.test/4")
+        subscription = await Subscription.objects.aget(user=self.user)
+        self.assertEqual(subscription.content_id, "cs_test_4")
+
+    @patch(
+        "stripe.checkout.Session.create_async",
+        new_callable=AsyncMock,
+        side_effect=stripe.error.APIConnectionError("timeout"),
+    )
+    @patch(
+        "users.services.aget_plan_price_id",
+        new_callable=AsyncMock,
+        return_value="price_test",
+    )
+    async def test_stripe_error_falls_back_to_job(self, *stripe_calls):
+        response = await SubscriptionCreateAsync.as_view()(self.get_request())
+
+        subscription = await Subscription.objects.aget(user=self.user)
+        self.assertEqual(
+            response.url, reverse("users:checkout_status", args=[subscription.pk])
+        )
+        self.assertTrue(await Job.objects.filter(status=Job.PENDING).aexists())
+
+
+class AvatarRenditionsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        buffer = BytesIO()
+        Image.new("RGB", (800, 800), "blue").save(buffer, "PNG")
+        self.user = User.objects.create(
+            phone_number="+79000000009",
+            avatar=SimpleUploadedFile(
+                "avatar.png", buffer.getvalue(), content_type="image/png"
+            ),
+        )
+
+    def test_profile_shows_avatar_renditions(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("users:profile"))
+
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, "-320w.webp 320w")
+
+    @patch("users.signals.refresh_renditions")
+    def test_login_does_not_touch_avatar(self, refresh_renditions):
+        self.client.force_login(self.user)
+
+        refresh_renditions.assert_not_called()
+
+
+class UserImportTestCase(TestCase):
+    def test_import_users_from_csv(self):
+        User.objects.create(phone_number="+79000000001", first_name="Old")
+        password = make_password("secret")
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as file:
+            file.write("phone_number,first_name,password,is_staff,premium_until\n")
+            file.write("+79000000001,New,,0,\n")
+            file.write(f"+79000000002,Anna,{password},1,2099-01-01T00:00:00\n")
+            file.write("+79000000003,Ivan,plain,0,\n")
+        self.addCleanup(os.remove, file.name)
+
+        result = import_users(file.name, batch_size=2)
+
+        self.assertEqual(result, {"read": 3, "created": 2})
+        self.assertEqual(
+            User.objects.get(phone_number="+79000000001").first_name, "Old"
+        )
+        anna = User.objects.get(phone_number="+79000000002")
+        self.assertTrue(anna.check_password("secret"))
+        self.assertTrue(anna.is_staff and anna.has_premium)
+        self.assertFalse(
+            User.objects.get(phone_number="+79000000003").has_usable_password()
+        )
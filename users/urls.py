@@ -1,8 +1,16 @@
+from django.conf import settings
 from django.contrib.auth.views import LoginView, LogoutView
 from django.urls import path
 
 from users.apps import UsersConfig
-from users.views import ProfileView, SubscriptionCreate, UserRegisterView
+from users.views import (
+    CheckoutStatusView,
+    ProfileView,
+    SubscriptionCreate,
+    SubscriptionCreateAsync,
+    UserRegisterView,
+    stripe_webhook,
+)
 
 app_name = UsersConfig.name
 
@@ -11,7 +19,17 @@ urlpatterns = [
     path("logout/", LogoutView.as_view(), name="logout"),
     path("register/", UserRegisterView.as_view(), name="register"),
     path("profile/", ProfileView.as_view(), name="profile"),
-    path("perform_create/", SubscriptionCreate.as_view(), name="perform_create"),
+    path(
+        "perform_create/",
+        (
+            SubscriptionCreateAsync if settings.ASYNC_VIEWS else SubscriptionCreate
+        ).as_view(),
+        name="perform_create",
+    ),
+    path(
+        "perform_create/<int:pk>/", CheckoutStatusView.as_view(), name="checkout_status"
+    ),
+    path("webhook/stripe/", stripe_webhook, name="stripe_webhook"),
 ]
 
 """
@@ -22,4 +40,6 @@ URL-шаблоны для аутентификации пользователя
 - 'register': Отображает страницу регистрации с использованием UserRegisterView.
 - 'profile': Отображает страницу профиля пользователя с использованием ProfileView.
 - 'perform_create': Эндпоинт для выполнения операции создания, вероятно, создание объекта.
+- 'checkout_status': Страница ожидания сессии оплаты, перенаправляет на оплату, когда сессия готова.
+- 'stripe_webhook': Эндпоинт для приема вебхуков Stripe о статусе оплаты.
 """
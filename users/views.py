@@ -1,16 +1,28 @@
 from datetime import datetime
 
+import stripe
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
-from django.shortcuts import redirect, render
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.views import redirect_to_login
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, UpdateView
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.views.generic import CreateView, DetailView, UpdateView, View
 
+from config.settings import STRIPE_WEBHOOK_SECRET
 from users.forms import UserProfileForm, UserRegisterForm
-from users.models import Subscription, User
-from users.services import (create_stripe_price, create_stripe_product,
-                            create_stripe_session, check_payment_status)
+from users.jobs import aenqueue, enqueue, get_job_name
+from users.models import Job, Subscription, User
+from users.services import (
+    acheck_subscription_status,
+    acreate_checkout_session,
+    apply_checkout_session_event,
+    create_checkout_session,
+    refresh_subscription_status,
+)
 
 
 class UserRegisterView(CreateView):
@@ -117,11 +129,19 @@ def logout_view(request):
     return render(request, "users/logout.html")
 
 
-class SubscriptionCreate(CreateView):
+class SubscriptionCreate(LoginRequiredMixin, CreateView):
 
     def get(self, request, *args, **kwargs):
         """
-            Обрабатывает GET-запрос пользователя для создания и обработки платежа через Stripe.
+            Обрабатывает GET-запрос пользователя для создания платежа через Stripe.
+
+            Сессия оплаты создается фоновой задачей, поэтому запрос не ждет ответов Stripe:
+            пользователь перенаправляется на страницу ожидания, которая отправит его
+            на страницу оплаты, как только сессия будет готова.
+
+            Статус подписки читается только из базы (User.premium_until). Если вебхук
+            не настроен, оплата прошлой сессии проверяется фоновой задачей: оплатившего
+            пользователя страница ожидания не отправит платить второй раз.
 
             Args:
             - request (HttpRequest): HTTP-запрос от пользователя.
@@ -129,25 +149,106 @@ class SubscriptionCreate(CreateView):
             - **kwargs: Именованные аргументы для дополнительной обработки.
 
             Returns:
-            - HttpResponse: Перенаправляет пользователя на страницу оплаты Stripe.
-
-            Raises:
-            - PermissionDenied: Если у пользователя уже есть оформленный платеж.
+            - HttpResponse: Перенаправляет пользователя на страницу ожидания оплаты.
         """
-        subs = request.user.payments
-        if subs and check_payment_status(subs.content_id):
+        if request.user.has_premium:
             return HttpResponse("Вы уже подписались на курс")
         else:
-            user = User.objects.get(pk=request.user.pk)
+            previous = request.user.payments
+            if previous is not None and previous.content_id and not STRIPE_WEBHOOK_SECRET:
+                enqueue(refresh_subscription_status, subscription_id=previous.pk,
+                        user_id=request.user.pk)
             payment = Subscription.objects.create(payment_data=datetime.now())
-            create_stripe_product(payment.pk, payment.payment_data)
-            price = create_stripe_price()
-            session_id, payment_url = create_stripe_session(price)
-            payment.content_id = session_id
-            payment.payment_url = payment_url
-            if check_payment_status(payment.content_id):
-                payment.is_subscribed = True
-            user.payments = payment
-            user.save()
-            payment.save()
-            return redirect(payment.payment_url)
+            User.objects.filter(pk=request.user.pk).update(payments=payment)
+            enqueue(create_checkout_session, subscription_id=payment.pk)
+            return redirect("users:checkout_status", pk=payment.pk)
+
+
+class SubscriptionCreateAsync(View):
+    """
+    Асинхронная версия SubscriptionCreate для режима ASYNC_VIEWS (ASGI).
+
+    Сессия оплаты создается прямо в запросе через асинхронный клиент Stripe:
+    пока Stripe отвечает, процесс обслуживает другие запросы. Если Stripe
+    недоступен, создание сессии передается фоновой задаче.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if user.has_premium:
+            return HttpResponse("Вы уже подписались на курс")
+        subs = await Subscription.objects.filter(pk=user.payments_id).afirst()
+        if await acheck_subscription_status(subs):
+            return HttpResponse("Вы уже подписались на курс")
+
+        payment = await Subscription.objects.acreate(payment_data=datetime.now())
+        await User.objects.filter(pk=user.pk).aupdate(payments=payment)
+        try:
+            payment_url = await acreate_checkout_session(payment.pk)
+        except stripe.error.StripeError:
+            await aenqueue(create_checkout_session, subscription_id=payment.pk)
+            return redirect("users:checkout_status", pk=payment.pk)
+        return redirect(payment_url)
+
+
+class CheckoutStatusView(LoginRequiredMixin, DetailView):
+    """
+    Класс-представление страницы ожидания сессии оплаты.
+
+    Когда фоновая задача создала сессию в Stripe, перенаправляет пользователя
+    на страницу оплаты. До этого страница обновляется каждые несколько секунд.
+
+    Attributes:
+        template_name: Имя шаблона страницы ожидания.
+    """
+
+    template_name = "users/checkout_status.html"
+    context_object_name = "subscription"
+
+    def get_object(self, queryset=None):
+        return get_object_or_404(Subscription, pk=self.kwargs["pk"], user=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        # Прошлая подписка могла оказаться оплаченной (см. refresh_subscription_status)
+        if request.user.has_premium:
+            return HttpResponse("Вы уже подписались на курс")
+        self.object = self.get_object()
+        if self.object.payment_url:
+            return redirect(self.object.payment_url)
+        failed = Job.objects.filter(
+            name=get_job_name(create_checkout_session),
+            payload__subscription_id=self.object.pk,
+            status=Job.FAILED,
+        ).exists()
+        return self.render_to_response(self.get_context_data(failed=failed))
+
+
+@csrf_exempt
+@require_POST
+def stripe_webhook(request):
+    """
+    Функция-представление для приема вебхуков Stripe.
+
+    Проверяет подпись события и сохраняет статус оплаты сессии checkout
+    в подписке пользователя.
+
+    Args:
+        request: Объект запроса HTTP.
+
+    Returns:
+        HTTP Response: 200, если событие принято, 400 при неверной подписи.
+    """
+    if not STRIPE_WEBHOOK_SECRET:
+        return HttpResponseBadRequest()
+    try:
+        event = stripe.Webhook.construct_event(
+            request.body,
+            request.headers.get("Stripe-Signature", ""),
+            STRIPE_WEBHOOK_SECRET,
+        )
+    except (ValueError, stripe.error.SignatureVerificationError):
+        return HttpResponseBadRequest()
+    apply_checkout_session_event(event)
+    return HttpResponse()